@@ -0,0 +1,93 @@
+import argparse
+import fnmatch
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+FileResult = tuple[str, int, list[tuple[int, int, str]], float, str | None]
+
+
+def init_worker() -> None:
+    import lab6.main
+
+
+def collect_files(source: str, include: str = '*', exclude: str | None = None) -> tuple[str, list[str]]:
+    excluded = os.path.abspath(exclude) if exclude else None
+
+    def wanted(path: str) -> bool:
+        path = os.path.abspath(path)
+        return fnmatch.fnmatch(os.path.basename(path), include) and not (
+            excluded and (path == excluded or path.startswith(excluded + os.sep)))
+
+    if os.path.isdir(source):
+        files = [os.path.join(root, name) for root, _, names in os.walk(source) for name in names]
+        return source, sorted(filter(wanted, files))
+    files = sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path) and wanted(path))
+    if not files:
+        return '', []
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]), files
+
+
+def lex_file(input_file: str, dump_file: str) -> FileResult:
+    from lab6.main import iter_tokens
+
+    started = time.perf_counter()
+    count = 0
+    bad_tokens = []
+    os.makedirs(os.path.dirname(dump_file), exist_ok=True)
+    try:
+        with open(dump_file, 'w', encoding='utf-8') as output:
+            for token in iter_tokens(input_file, output_file=output):
+                count += 1
+                if token.type == 'BAD':
+                    bad_tokens.append((*token.pos, token.value))
+    except (OSError, UnicodeDecodeError) as error:
+        if os.path.exists(dump_file):
+            os.remove(dump_file)
+        return input_file, 0, [], time.perf_counter() - started, f'{type(error).__name__}: {error}'
+    return input_file, count, bad_tokens, time.perf_counter() - started, None
+
+
+def lex_batch(source: str, output_dir: str, workers: int | None = None, include: str = '*') -> list[FileResult]:
+    base, files = collect_files(source, include, output_dir)
+    dump_files = [os.path.join(output_dir, os.path.relpath(os.path.abspath(path), os.path.abspath(base)) + '.tokens')
+                  for path in files]
+
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        results = list(executor.map(lex_file, files, dump_files, chunksize=max(1, len(files) // 64)))
+
+    with open(os.path.join(output_dir, 'summary.txt'), 'w', encoding='utf-8') as summary:
+        for path, count, bad_tokens, seconds, error in results:
+            if error:
+                summary.write(f'{path} failed: {error}\n')
+            else:
+                summary.write(f'{path} tokens={count} bad={len(bad_tokens)} time={seconds:.3f}s\n')
+        summary.write(f'files={len(results)} tokens={sum(result[1] for result in results)} '
+                      f'bad={sum(len(result[2]) for result in results)} '
+                      f'failed={sum(1 for result in results if result[4])}\n')
+
+    with open(os.path.join(output_dir, 'bad.txt'), 'w', encoding='utf-8') as report:
+        for path, _, bad_tokens, _, _ in results:
+            for line, column, value in sorted(bad_tokens):
+                report.write(f'{path} ({line}, {column}) "{value}"\n')
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Lex every file in a directory or glob in parallel')
+    parser.add_argument('source', help='directory or glob pattern')
+    parser.add_argument('output', help='output directory')
+    parser.add_argument('workers', type=int, nargs='?')
+    parser.add_argument('--include', default='*', help='file name pattern for directory sources, e.g. *.txt')
+    args = parser.parse_args()
+
+    results = lex_batch(args.source, args.output, args.workers, args.include)
+    failed = sum(1 for result in results if result[4])
+    print(f'{len(results)} files lexed, {sum(len(result[2]) for result in results)} bad tokens, {failed} failed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import random
+import sys
+
+from lab6.benchmark import generate_source
+from lab6.lexer import Lexer
+from lab6.main import process_tokens, relex_tokens
+from lab6.parallel import lex_parallel
+from lab6.token_stream import TokenStream
+
+ENGINES = ('re', 'types')
+NOISE = "abzAZ_09E.+-*/'{}()[];:,=<>!#@$~\"\\ \t\r\n\xa0é"
+EDIT_PIECES = ('', 'x', ' ', '\n', '{', '}', "'", '//', '1.5E', '3', 'E+', 'integer', 'BEGIN', 'é', '#', ';',
+               'ab cd', '{ c }', "'s'", '\n//c\n', '99999999999999999999')
+
+
+def mutate(rng: random.Random, text: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        position = rng.randint(0, len(chars))
+        if rng.random() < 0.5 and position < len(chars):
+            del chars[position:position + rng.randint(1, 4)]
+        else:
+            chars[position:position] = rng.choices(NOISE, k=rng.randint(1, 4))
+    return ''.join(chars)
+
+
+def lex_all(text: str, skip_trivia: bool, engine: str) -> list[tuple[str, int, str]]:
+    lexer = Lexer(text=text, skip_trivia=skip_trivia, engine=engine)
+    tokens = []
+    while (token := lexer.next_token()) is not None:
+        tokens.append((token.type, token.start, token.value))
+    return tokens
+
+
+def compare(text: str, skip_trivia: bool, engine: str = 're') -> tuple[int, tuple | None, tuple | None] | None:
+    expected = lex_all(text, skip_trivia, 'dfa')
+    actual = lex_all(text, skip_trivia, engine)
+    for i in range(max(len(expected), len(actual))):
+        left = expected[i] if i < len(expected) else None
+        right = actual[i] if i < len(actual) else None
+        if left != right:
+            return i, left, right
+    return None
+
+
+def full_stream(text: str) -> TokenStream:
+    return process_tokens(Lexer(text=text, skip_trivia=True))
+
+
+def stream_columns(stream: TokenStream) -> tuple[list[int], list[int], list[int]]:
+    return list(stream.types), list(stream.starts), list(stream.ends)
+
+
+def check_relex(rng: random.Random, text: str, edits: int) -> int:
+    failures = 0
+    stream = full_stream(text)
+    for _ in range(edits):
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, min(6, len(text) - offset)) if rng.random() < 0.6 else 0
+        inserted = ''.join(rng.choices(EDIT_PIECES, k=rng.randint(0, 2)))
+        stream = relex_tokens(stream, offset, deleted, inserted)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        expected = full_stream(text)
+        if stream.text != text or stream_columns(stream) != stream_columns(expected) \
+                or any(actual < wanted for actual, wanted in zip(stream.reach, expected.reach)):
+            failures += 1
+            print(f'relex at {offset} deleting {deleted} inserting {inserted!r} differs from a full re-lex')
+            stream = expected
+    return failures
+
+
+def check_parallel(rng: random.Random, text: str) -> int:
+    chunks = rng.randint(2, 16)
+    lookahead = rng.choice((1, 8, 64))
+    expected = full_stream(text)
+    actual = lex_parallel(text=text, workers=2, chunks=chunks, lookahead=lookahead)
+    if stream_columns(actual) != stream_columns(expected) or list(actual.reach) != list(expected.reach):
+        print(f'parallel lexing with {chunks} chunks and lookahead {lookahead} differs from a serial lex')
+        return 1
+    return 0
+
+
+def run_conformance(count: int, size: int, seed: int, edits: int = 20, parallel: int = 10) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for case in range(count):
+        text = generate_source(rng.randint(1, size), seed=rng.randrange(2 ** 32))
+        text = mutate(rng, text, rng.randint(0, 4))
+        for engine in ENGINES:
+            for skip_trivia in (False, True):
+                mismatch = compare(text, skip_trivia, engine)
+                if mismatch is not None:
+                    failures += 1
+                    index, expected, actual = mismatch
+                    print(f'case {case} skip_trivia={skip_trivia} token {index}: dfa={expected} {engine}={actual}')
+        failures += check_relex(rng, text, edits)
+        if case < parallel:
+            failures += check_parallel(rng, text)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Check the other lexer engines and incremental and parallel lexing against the DFA engine')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--edits', type=int, default=20, help='random edits re-lexed per input')
+    parser.add_argument('--parallel', type=int, default=10, help='inputs also lexed in parallel chunks')
+    args = parser.parse_args()
+
+    failures = run_conformance(args.count, args.size, args.seed, args.edits, args.parallel)
+    print(f'{args.count} inputs, {failures} mismatches')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
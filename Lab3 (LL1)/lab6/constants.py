@@ -1,10 +1,10 @@
-LETTER_LOWER = '(a|b|c|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|s|t|u|v|w|x|y|z)'
-LETTER_UPPER = '(A|B|C|D|E|F|G|H|I|J|K|L|M|N|O|P|Q|R|S|T|U|V|W|X|Y|Z)'
-LETTER = f'({LETTER_LOWER}|{LETTER_UPPER})'
-DIGIT_NO_ZERO = '(1|2|3|4|5|6|7|8|9)'
-DIGIT = f'(0|{DIGIT_NO_ZERO})'
+LETTER_LOWER = '[a-z]'
+LETTER_UPPER = '[A-Z]'
+LETTER = '[a-zA-Z]'
+DIGIT_NO_ZERO = '[1-9]'
+DIGIT = '[0-9]'
 NUMBER = f'({DIGIT}|{DIGIT_NO_ZERO}{DIGIT}*)'
-LETTER_OR_DIGIT = f'({LETTER}|{DIGIT})'
-SPACE = '( |\n|\t|\r)'
-DIVIDER = f'({SPACE}|\"|\\(|\\)|\\+|-|;|:|,|\\.|[|]|{{|}}|\\*|/|\'|\xa0|<|>|=)'
-EXPONENT = f'(E(\\+|-|ε){DIGIT}+)'
+LETTER_OR_DIGIT = '[a-zA-Z0-9]'
+SPACE = '[ \n\t\r]'
+DIVIDER = '[ \n\t\r"()+\\-;:,.\\[\\]{}*/\'\xa0<>=]'
+EXPONENT = f'(E([+-]|ε){DIGIT}+)'
@@ -1,41 +1,94 @@
 import sys
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
 
 from lab6.lexer import Lexer
 from lab6.lexer_token import LexerToken
+from lab6.token_stream import TokenStream, TYPE_IDS
 
 
-def process_tokens(lexer: Lexer, debug: bool = False, output_file=None) -> list[LexerToken]:
-    tokens = []
-    bad_collector = LexerToken('BAD', '', (0, 0))
+def significant_tokens(lexer: Lexer) -> Iterator[LexerToken]:
+    bad_collector = None
     while True:
         token = lexer.next_token()
         if token is None:
             break
+        if bad_collector is not None and (token.type != 'BAD' or lexer.skipped_trivia):
+            yield bad_collector
+            bad_collector = None
         if token.type == 'BAD':
-            bad_collector.value += token.value
-            if not bad_collector.pos[0] and not bad_collector.pos[1]:
-                bad_collector.pos = token.pos
+            if bad_collector is not None:
+                bad_collector.value += token.value
+                bad_collector.reach = max(bad_collector.reach, token.reach)
+            else:
+                bad_collector = LexerToken('BAD', token.value, start=token.start, lines=token.lines,
+                                           reach=token.reach)
             continue
-        if bad_collector.value:
-            print(bad_collector) if debug else None
-            if output_file:
-                output_file.write(str(bad_collector) + '\n')
-            tokens.append(bad_collector)
-            bad_collector = LexerToken('BAD', '', (0, 0))
         if token.type not in ('SPACE', 'LINE_COMMENT', 'BLOCK_COMMENT'):
-            print(token) if debug else None
-            if output_file:
-                output_file.write(str(token) + '\n')
-            tokens.append(token)
-    if bad_collector.value:
-        print(bad_collector) if debug else None
+            yield token
+    if bad_collector is not None:
+        yield bad_collector
+
+
+def dump_tokens(tokens: Iterable[LexerToken], debug: bool = False, output_file=None) -> Iterator[LexerToken]:
+    for token in tokens:
+        print(token) if debug else None
         if output_file:
-            output_file.write(str(bad_collector) + '\n')
-        tokens.append(bad_collector)
+            output_file.write(str(token) + '\n')
+        yield token
+
+
+def process_tokens(lexer: Lexer, debug: bool = False, output_file=None) -> TokenStream:
+    tokens = TokenStream(lexer.text, lexer.lines)
+    for token in dump_tokens(significant_tokens(lexer), debug, output_file):
+        tokens.append_token(token)
+    return tokens
+
+
+def relex_tokens(tokens: TokenStream, offset: int, deleted: int, inserted: str) -> TokenStream:
+    text = tokens.text[:offset] + inserted + tokens.text[offset + deleted:]
+    shift = len(inserted) - deleted
+    bad = TYPE_IDS['BAD']
+
+    first = bisect_right(tokens.reach, offset)
+    while first and tokens.types[first - 1] == bad:
+        first -= 1
 
+    lexer = Lexer(text=text, skip_trivia=True)
+    lexer.position = tokens.ends[first - 1] if first else 0
+    floor = tokens.reach[first - 1] if first else -1
+    relexed = []
+    index = stop = first
+    for token in significant_tokens(lexer):
+        end = token.start + len(token.value)
+        floor = max(floor, token.reach)
+        relexed.append((TYPE_IDS[token.type], token.start, end, floor))
+        if end <= offset + len(inserted):
+            continue
+        index = bisect_left(tokens.ends, end - shift, index)
+        if index < len(tokens) and tokens.ends[index] == end - shift:
+            stop = index + 1
+            break
+    else:
+        stop = len(tokens)
+
+    if relexed and relexed[-1][0] == bad and stop < len(tokens) and tokens.types[stop] == bad \
+            and tokens.starts[stop] == tokens.ends[stop - 1]:
+        type_id, start, _, reach = relexed[-1]
+        relexed[-1] = type_id, start, tokens.ends[stop] + shift, max(reach, tokens.reach[stop] + shift)
+        stop += 1
+    tokens.replace(text, first, stop, relexed, shift)
     return tokens
 
 
+def iter_tokens(input_file: str, debug: bool = False, output_file=None) -> Iterator[LexerToken]:
+    lexer = Lexer(input_file, skip_trivia=True)
+    try:
+        yield from dump_tokens(significant_tokens(lexer), debug, output_file)
+    finally:
+        lexer.close()
+
+
 def main() -> None:
     if len(sys.argv) not in {3, 4}:
         print(f'Usage: python {sys.argv[0]} <input-file> <output-file> [debug]')
@@ -45,18 +98,18 @@ def main() -> None:
     output_file = sys.argv[2]
     debug = sys.argv[3] == 'debug' if len(sys.argv) == 4 else False
 
-    lexer = Lexer(input_file)
-
     with open(output_file, 'w', encoding='utf-8') as output:
-        process_tokens(lexer, debug, output)
-
-    lexer.close()
+        for _ in iter_tokens(input_file, debug, output):
+            pass
 
 
-def task(input_file: str, debug=False) -> list[LexerToken]:
-    lexer = Lexer(input_file)
-    with open("output.txt", 'w', encoding='utf-8') as output:
-        tokens = process_tokens(lexer, debug, output)
+def task(input_file: str, debug=False, output_path: str | None = None) -> TokenStream:
+    lexer = Lexer(input_file, skip_trivia=True)
+    if output_path is None:
+        tokens = process_tokens(lexer, debug)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as output:
+            tokens = process_tokens(lexer, debug, output)
     lexer.close()
     return tokens
 
@@ -0,0 +1,123 @@
+from .compiled import CharClasses
+from .regex_to_nfa import RegexNode, range_label
+
+Positions = tuple[bool, int, int]
+
+
+class PositionAutomaton:
+    def __init__(self, node: RegexNode, cache_size: int = 256):
+        self.cache_size = cache_size
+        self.steps: dict[int, int] = {}
+        self.follow: list[int] = []
+        self.any_mask = 0
+        self.ranges: list[tuple[int, int, int]] = []
+        self.nullable, self.first, self.last = self.visit(node)
+
+        bounds = sorted({low for low, _, _ in self.ranges} | {high + 1 for _, high, _ in self.ranges})
+        self.classes = CharClasses()
+        self.masks = [0]
+        for low, high in zip(bounds, bounds[1:]):
+            mask = 0
+            for first, last, bit in self.ranges:
+                if first <= low and high - 1 <= last:
+                    mask |= bit
+            if mask:
+                self.classes.add(range_label(chr(low), chr(high - 1)), len(self.masks))
+                self.masks.append(mask)
+
+    def position(self) -> int:
+        self.follow.append(0)
+        return 1 << (len(self.follow) - 1)
+
+    def link(self, sources: int, targets: int) -> None:
+        while sources:
+            low = sources & -sources
+            self.follow[low.bit_length() - 1] |= targets
+            sources ^= low
+
+    def visit(self, node: RegexNode) -> Positions:
+        results: list[Positions] = []
+        stack: list[tuple[RegexNode, bool]] = [(node, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node.value in ('concat', 'or', 'multiply', 'add', 'not') and not visited:
+                stack.append((node, True))
+                if node.right is not None:
+                    stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            results.append(self.combine(node, results))
+        return results[0]
+
+    def combine(self, node: RegexNode, results: list[Positions]) -> Positions:
+        if node.value == 'concat':
+            right_nullable, right_first, right_last = results.pop()
+            left_nullable, left_first, left_last = results.pop()
+            self.link(left_last, right_first)
+            return (left_nullable and right_nullable,
+                    left_first | right_first if left_nullable else left_first,
+                    right_last | left_last if right_nullable else right_last)
+        if node.value == 'or':
+            right_nullable, right_first, right_last = results.pop()
+            left_nullable, left_first, left_last = results.pop()
+            return left_nullable or right_nullable, left_first | right_first, left_last | right_last
+        if node.value in ('multiply', 'add'):
+            nullable, first, last = results.pop()
+            self.link(last, first)
+            return nullable or node.value == 'multiply', first, last
+        if node.value == 'not':
+            _, first, _ = results.pop()
+            bit = self.position()
+            self.any_mask |= bit
+            return False, bit | first, bit
+        if node.value == 'ε':
+            return True, 0, 0
+
+        if node.value == 'any':
+            bit = self.position()
+            self.any_mask |= bit
+            return False, bit, bit
+
+        ranges = node.ranges if node.value == 'class' else ((node.value, node.value),)
+        if not ranges:
+            return False, 0, 0
+        bit = self.position()
+        for low, high in ranges:
+            self.ranges.append((ord(low), ord(high), bit))
+        return False, bit, bit
+
+    def follow_all(self, consumed: int) -> int:
+        if len(self.steps) >= self.cache_size:
+            self.steps.clear()
+        follow = self.follow
+        active = 0
+        positions = consumed
+        while positions:
+            low = positions & -positions
+            active |= follow[low.bit_length() - 1]
+            positions ^= low
+        self.steps[consumed] = active
+        return active
+
+    def run(self, text: str, start: int = 0) -> int:
+        return self.match(text, start)[0]
+
+    def match(self, text: str, start: int = 0) -> tuple[int, int]:
+        classes = self.classes
+        masks = self.masks
+        steps = self.steps
+        any_mask = self.any_mask
+        last = self.last
+
+        active = self.first
+        last_accept = start if self.nullable else -1
+        for position in range(start, len(text)):
+            consumed = active & masks[classes[text[position]]] or active & any_mask
+            if consumed & last:
+                last_accept = position + 1
+            active = steps.get(consumed)
+            if active is None:
+                active = self.follow_all(consumed)
+            if not active:
+                return last_accept, position + 1
+        return last_accept, len(text)
@@ -0,0 +1,119 @@
+from array import array
+from bisect import bisect_right
+from typing import Callable, Hashable
+
+from .minimize import Machine
+from .regex_to_nfa import label_range, split_ranges
+
+ANY = 'ANY'
+
+
+class CharClasses(dict):
+    def __init__(self):
+        super().__init__()
+        self.starts: list[int] = []
+        self.ranges: list[tuple[int, int, int]] = []
+
+    def add(self, label: str, class_id: int) -> None:
+        low, high = label_range(label)
+        if low == high:
+            self[low] = class_id
+            return
+        index = bisect_right(self.starts, ord(low))
+        self.starts.insert(index, ord(low))
+        self.ranges.insert(index, (ord(low), ord(high), class_id))
+
+    def __missing__(self, symbol: str) -> int:
+        code = ord(symbol)
+        index = bisect_right(self.starts, code) - 1
+        class_id = self.ranges[index][2] if index >= 0 and code <= self.ranges[index][1] else 0
+        self[symbol] = class_id
+        return class_id
+
+
+class CompiledMachine:
+    def __init__(self, classes: CharClasses, class_count: int, table: array, accepting: bytes, universal: bytes,
+                 start: int):
+        self.classes = classes
+        self.class_count = class_count
+        self.table = table
+        self.accepting = accepting
+        self.universal = universal
+        self.start = start
+
+
+def step(machine: Machine, state: str, symbol: str) -> str:
+    transitions = machine[2][state]
+    target = transitions.get(symbol, '') if symbol != ANY else ''
+    return target or transitions.get(ANY, '')
+
+
+def coaccessible_states(machine: Machine) -> set[str]:
+    states, _, transitions, outputs, _ = machine
+    predecessors: dict[str, set[str]] = {state: set() for state in states}
+    for state in states:
+        for target in transitions[state].values():
+            if target in predecessors:
+                predecessors[target].add(state)
+
+    coaccessible = {state for state in states if outputs[state] == 'F'}
+    to_visit = list(coaccessible)
+    while to_visit:
+        for predecessor in predecessors[to_visit.pop()]:
+            if predecessor not in coaccessible:
+                coaccessible.add(predecessor)
+                to_visit.append(predecessor)
+    return coaccessible
+
+
+def shared_symbols(machines: list[Machine]) -> tuple[list[str], list[dict[str, str]]]:
+    parts = split_ranges({symbol for machine in machines for symbol in machine[1] if label_range(symbol)})
+    owners: list[dict[str, str]] = [{} for _ in machines]
+    for i, machine in enumerate(machines):
+        for symbol in machine[1]:
+            for part in parts.get(symbol, ()):
+                owners[i][part] = symbol
+    return sorted({part for labels in parts.values() for part in labels}), owners
+
+
+def build_classes(symbols: list[str], column: Callable[[str], Hashable]) -> tuple[CharClasses, list[str]]:
+    class_ids = {column(ANY): 0}
+    representatives = [ANY]
+    classes = CharClasses()
+    for symbol in symbols:
+        key = column(symbol)
+        if key not in class_ids:
+            class_ids[key] = len(representatives)
+            representatives.append(symbol)
+        if class_ids[key]:
+            classes.add(symbol, class_ids[key])
+    return classes, representatives
+
+
+def compile_machine(machine: Machine) -> CompiledMachine:
+    states, input_symbols, transitions, outputs, initial_state = machine
+    coaccessible = coaccessible_states(machine)
+    state_ids = {state: i + 1 for i, state in enumerate(states) if state in coaccessible}
+    state_ids.setdefault(initial_state, 0)
+
+    def column(symbol: str) -> tuple[int, ...]:
+        return tuple(state_ids.get(step(machine, state, symbol), 0) for state in states)
+
+    classes, representatives = build_classes([s for s in input_symbols if label_range(s)], column)
+    class_count = len(representatives)
+
+    table = array('i', [0] * class_count * (len(states) + 1))
+    accepting = bytearray(len(table))
+    universal = bytearray(len(table))
+    for state, state_id in state_ids.items():
+        offset = state_id * class_count
+        if not offset:
+            continue
+        row = [state_ids.get(step(machine, state, symbol), 0) * class_count for symbol in representatives]
+        table[offset:offset + class_count] = array('i', row)
+        if outputs[state] == 'F':
+            accepting[offset] = 1
+            universal[offset] = all(target == offset for target in row)
+
+    return CompiledMachine(classes, class_count, table, bytes(accepting), bytes(universal),
+                           state_ids[initial_state] * class_count)
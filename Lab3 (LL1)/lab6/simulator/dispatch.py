@@ -0,0 +1,18 @@
+from .compiled import ANY, build_classes, coaccessible_states, shared_symbols, step
+from .minimize import Machine
+
+
+class FirstCharIndex:
+    def __init__(self, machines: list[Machine]):
+        symbols, owners = shared_symbols(machines)
+        coaccessible = [coaccessible_states(machine) for machine in machines]
+
+        def column(symbol: str) -> tuple[int, ...]:
+            return tuple(i for i, machine in enumerate(machines)
+                         if step(machine, machine[4], owners[i].get(symbol, ANY)) in coaccessible[i])
+
+        self.classes, representatives = build_classes(symbols, column)
+        self.entries = [column(symbol) for symbol in representatives]
+
+    def candidates(self, symbol: str) -> tuple[int, ...]:
+        return self.entries[self.classes[symbol]]
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+
+from .nfa_to_dfa import epsilon_closure
+from .regex_to_nfa import NFA, label_range
+
+LazyState = tuple[bool, dict[str, frozenset[int] | None]]
+
+
+class LazyDFA:
+    def __init__(self, nfa: NFA, cache_size: int = 256, min_reuse: int = 4):
+        self.nfa = nfa
+        self.cache_size = cache_size
+        self.min_reuse = min_reuse
+        self.closures: dict[int, frozenset[int]] = {}
+        self.literal_edges: list[list[tuple[int, int, int]]] = [[] for _ in range(nfa.state_count)]
+        self.any_edges: list[list[int]] = [[] for _ in range(nfa.state_count)]
+        for state in range(nfa.state_count):
+            for edge in nfa.edges(state):
+                label = nfa.labels[edge]
+                if label == 'ANY':
+                    self.any_edges[state].append(nfa.targets[edge])
+                elif label_range(label):
+                    low, high = label_range(label)
+                    self.literal_edges[state].append((ord(low), ord(high), nfa.targets[edge]))
+
+        self.initial = epsilon_closure(nfa.start_state, nfa, self.closures)
+        self.states: OrderedDict[frozenset[int], LazyState] = OrderedDict()
+        self.steps = 0
+        self.misses = 0
+        self.thrashing = False
+
+    def move(self, subset: frozenset[int], symbol: str) -> frozenset[int] | None:
+        code = ord(symbol)
+        targets = {target for state in subset for low, high, target in self.literal_edges[state]
+                   if low <= code <= high}
+        if not targets:
+            targets = {target for state in subset for target in self.any_edges[state]}
+        if not targets:
+            return None
+        return frozenset().union(*(epsilon_closure(target, self.nfa, self.closures) for target in targets))
+
+    def state(self, subset: frozenset[int]) -> LazyState:
+        state = self.states.get(subset)
+        if state is not None:
+            self.states.move_to_end(subset)
+            return state
+
+        self.misses += 1
+        if len(self.states) >= self.cache_size:
+            self.states.popitem(last=False)
+            if self.steps < self.misses * self.min_reuse:
+                self.thrashing = True
+        state = self.states[subset] = (self.nfa.accept_state in subset, {})
+        return state
+
+    def run(self, text: str, start: int = 0) -> int:
+        return self.match(text, start)[0]
+
+    def match(self, text: str, start: int = 0) -> tuple[int, int]:
+        if self.thrashing:
+            return self.simulate(text, start)
+
+        subset = self.initial
+        accepting, transitions = self.state(subset)
+        last_accept = start if accepting else -1
+        for position in range(start, len(text)):
+            symbol = text[position]
+            if symbol in transitions:
+                target = transitions[symbol]
+            else:
+                target = transitions[symbol] = self.move(subset, symbol)
+            if target is None:
+                self.steps += position - start
+                return last_accept, position + 1
+            subset = target
+            accepting, transitions = self.state(subset)
+            if accepting:
+                last_accept = position + 1
+        self.steps += len(text) - start
+        return last_accept, len(text)
+
+    def simulate(self, text: str, start: int = 0) -> tuple[int, int]:
+        subset = self.initial
+        last_accept = start if self.nfa.accept_state in subset else -1
+        for position in range(start, len(text)):
+            subset = self.move(subset, text[position])
+            if subset is None:
+                return last_accept, position + 1
+            if self.nfa.accept_state in subset:
+                last_accept = position + 1
+        return last_accept, len(text)
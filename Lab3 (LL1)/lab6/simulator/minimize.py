@@ -20,37 +20,57 @@ def remove_unreachable_states(machine: Machine) -> Machine:
     return list(filter(lambda x: x in reachable_states, states)), input_symbols, transitions, outputs, initial_state
 
 
-def refine(partitions: list[set[str]], input_symbols: list[str], transitions: dict[str, dict[str, str]]) \
-        -> list[set[str]]:
-    new_partitions: list[set[str]] = []
-    for group in partitions:
-        subgroup = {}
-        for state in group:
-            key = ''
-            for symbol in input_symbols:
-                for i, s in enumerate(partitions):
-                    if transitions[state][symbol] in s:
-                        key += symbol + str(i)
-            subgroup.setdefault(key, set()).add(state)
-        new_partitions.extend(subgroup.values())
-    return new_partitions
+def refine(blocks: list[set[int]], block_of: list[int], inverse: list[dict[int, list[int]]]) -> list[set[int]]:
+    symbol_count = len(inverse)
+    largest = max(range(len(blocks)), key=lambda i: len(blocks[i]))
+    waiting = {(i, symbol) for i in range(len(blocks)) if i != largest for symbol in range(symbol_count)}
+
+    while waiting:
+        splitter, symbol = waiting.pop()
+        predecessors: dict[int, set[int]] = {}
+        for state in blocks[splitter]:
+            for predecessor in inverse[symbol].get(state, ()):
+                predecessors.setdefault(block_of[predecessor], set()).add(predecessor)
+
+        for block, inside in predecessors.items():
+            if len(inside) == len(blocks[block]):
+                continue
+            outside = blocks[block] - inside
+            if len(inside) > len(outside):
+                inside, outside = outside, inside
+            blocks[block] = outside
+            new_block = len(blocks)
+            blocks.append(inside)
+            for state in inside:
+                block_of[state] = new_block
+            for other_symbol in range(symbol_count):
+                waiting.add((new_block, other_symbol))
+    return blocks
 
 
 def minimize_moore_machine(machine: Machine) -> Machine:
     states, input_symbols, transitions, outputs, initial_state = machine
 
-    output_groups: dict[str, set[str]] = {}
+    state_ids = {state: i for i, state in enumerate(states)}
+    dead = len(states)
+    inverse: list[dict[int, list[int]]] = [{} for _ in input_symbols]
     for state in states:
-        output = outputs[state]
-        output_groups.setdefault(output, set()).add(state)
+        for i, symbol in enumerate(input_symbols):
+            target = transitions[state][symbol]
+            inverse[i].setdefault(state_ids[target] if target else dead, []).append(state_ids[state])
 
-    partitions = list(output_groups.values())
+    output_groups: dict[str, set[int]] = {}
+    for state in states:
+        output_groups.setdefault(outputs[state], set()).add(state_ids[state])
+    blocks = list(output_groups.values())
+    if any(dead in targets for targets in inverse):
+        blocks.append({dead})
+    block_of = [0] * (dead + 1)
+    for i, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = i
 
-    while True:
-        new_partitions = refine(partitions, input_symbols, transitions)
-        if new_partitions == partitions:
-            break
-        partitions = new_partitions
+    partitions = sorted((block for block in refine(blocks, block_of, inverse) if dead not in block), key=min)
 
     state_map = {}
     minimized_states = []
@@ -60,13 +80,12 @@ def minimize_moore_machine(machine: Machine) -> Machine:
     for i, group in enumerate(partitions):
         new_state = f'S{i}'
         for state in group:
-            state_map[state] = new_state
+            state_map[states[state]] = new_state
         minimized_states.append(new_state)
-        representative = next(iter(group))
-        minimized_outputs[new_state] = outputs[representative]
+        minimized_outputs[new_state] = outputs[states[min(group)]]
 
     for group in partitions:
-        representative = next(iter(group))
+        representative = states[min(group)]
         new_state = state_map[representative]
         minimized_transitions[new_state] = {
             symbol: state_map[transitions[representative][symbol]] if transitions[representative][symbol] else ''
@@ -0,0 +1,199 @@
+import re
+import sys
+
+from .compiled import ANY
+from .minimize import Machine
+from .regex_to_nfa import label_range, normalize_ranges
+
+Ranges = tuple[tuple[str, str], ...]
+Context = tuple[tuple[frozenset[str], str], ...]
+
+FAIL = '(?!)'
+MAX_PATTERN_SIZE = 1 << 16
+
+
+def char_class(ranges: Ranges) -> str:
+    if ranges == (('\0', chr(sys.maxunicode)),):
+        return '(?s:.)'
+    if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+        return re.escape(ranges[0][0])
+    negated = ranges[0][0] == '\0' and ranges[-1][1] == chr(sys.maxunicode)
+    items = ''.join(re.escape(low) if low == high else f'{re.escape(low)}-{re.escape(high)}'
+                    for low, high in (normalize_ranges(list(ranges), True) if negated else ranges))
+    return f'[^{items}]' if negated else f'[{items}]'
+
+
+def alternatives(branches: list[tuple[str, str]], optional: bool) -> str:
+    branches = [edge + continuation for edge, continuation in branches if continuation != FAIL]
+    if optional:
+        return f'(?:{"|".join(branches)}|)' if branches else ''
+    if not branches:
+        return FAIL
+    return branches[0] if len(branches) == 1 else f'(?:{"|".join(branches)})'
+
+
+class PatternWriter:
+    def __init__(self, machine: Machine):
+        states, input_symbols, transitions, outputs, initial_state = machine
+        literals = [symbol for symbol in input_symbols if label_range(symbol)]
+        self.initial = initial_state
+        self.states = frozenset(states)
+        self.accepting = {state for state in states if outputs[state] == 'F'}
+
+        moves: dict[str, dict[str, list[tuple[str, str]]]] = {}
+        for state in states:
+            moves[state] = {}
+            taken = []
+            for symbol in literals:
+                target = transitions[state].get(symbol, '')
+                if target:
+                    taken.append(label_range(symbol))
+                    moves[state].setdefault(target, []).append(label_range(symbol))
+            target = transitions[state].get(ANY, '')
+            if target:
+                moves[state].setdefault(target, []).extend(normalize_ranges(taken, True))
+
+        self.live = set(self.accepting)
+        changed = True
+        while changed:
+            changed = False
+            for state in states:
+                if state not in self.live and any(target in self.live for target in moves[state]):
+                    self.live.add(state)
+                    changed = True
+
+        self.edges: dict[str, list[tuple[str, str]]] = {}
+        self.loops: dict[str, str] = {}
+        for state in states:
+            self.edges[state] = []
+            for target, ranges in moves[state].items():
+                if target not in self.live or not ranges:
+                    continue
+                if target == state:
+                    self.loops[state] = char_class(normalize_ranges(ranges, False))
+                else:
+                    self.edges[state].append((char_class(normalize_ranges(ranges, False)), target))
+
+        self.scopes: dict[frozenset[str], dict[str, frozenset[str]]] = {}
+        self.heads: dict[frozenset[str], str] = {}
+        self.memo: dict[tuple, str] = {}
+
+    def components(self, scope: frozenset[str]) -> dict[str, frozenset[str]]:
+        if scope not in self.scopes:
+            reachable = {}
+            for state in scope:
+                seen = {state}
+                stack = [state]
+                while stack:
+                    for _, target in self.edges[stack.pop()]:
+                        if target in scope and target not in seen:
+                            seen.add(target)
+                            stack.append(target)
+                reachable[state] = seen
+            self.scopes[scope] = {state: frozenset(other for other in reachable[state] if state in reachable[other])
+                                  for state in scope}
+        return self.scopes[scope]
+
+    def acyclic_without(self, component: frozenset[str], head: str) -> bool:
+        remaining = set(component - {head})
+        while remaining:
+            sources = [state for state in remaining
+                       if not any(state == target for other in remaining for _, target in self.edges[other])]
+            if not sources:
+                return False
+            remaining.difference_update(sources)
+        return True
+
+    def head(self, component: frozenset[str]) -> str:
+        if component not in self.heads:
+            if self.initial in component:
+                self.heads[component] = self.initial
+            else:
+                self.heads[component] = next((state for state in sorted(component)
+                                              if self.acyclic_without(component, state)), min(component))
+        return self.heads[component]
+
+    def scope(self, context: Context) -> frozenset[str]:
+        if not context:
+            return self.states
+        component = context[-1][0]
+        return component - {self.head(component)}
+
+    def cached(self, key: tuple, build) -> str:
+        if key not in self.memo:
+            pattern = build()
+            if len(pattern) > MAX_PATTERN_SIZE:
+                raise ValueError(f'Pattern for a {len(self.states)}-state machine exceeds {MAX_PATTERN_SIZE} characters')
+            self.memo[key] = pattern
+        return self.memo[key]
+
+    def prefix(self, state: str, rest: str) -> str:
+        if rest == FAIL or state not in self.loops:
+            return rest
+        return f'{self.loops[state]}*+{rest}'
+
+    def can_stop(self, state: str, context: Context) -> bool:
+        return state in self.accepting and all(role != 'back' for _, role in context)
+
+    def walk(self, state: str, context: Context) -> str:
+        return self.cached((state, context), lambda: self._walk(state, context))
+
+    def _walk(self, state: str, context: Context) -> str:
+        component = self.components(self.scope(context))[state]
+        if len(component) > 1:
+            head = self.head(component)
+            if state != head:
+                return self.walk(state, context + ((component, 'enter'),))
+            rest = self.leave(component, context)
+            return rest if rest == FAIL else f'(?:{self.cycle(component, context)})*{rest}'
+        branches = [(edge, self.follow(target, context)) for edge, target in self.edges[state]]
+        return self.prefix(state, alternatives(branches, self.can_stop(state, context)))
+
+    def follow(self, target: str, context: Context) -> str:
+        for depth in range(len(context) - 1, -1, -1):
+            component, role = context[depth]
+            if target == self.head(component):
+                if role == 'back':
+                    return ''
+                return self.walk(target, context[:depth]) if role == 'enter' else FAIL
+            if target in component:
+                return self.walk(target, context[:depth + 1])
+            if role == 'back':
+                return FAIL
+        return self.walk(target, ())
+
+    def cycle(self, component: frozenset[str], context: Context) -> str:
+        head = self.head(component)
+        inner = context + ((component, 'back'),)
+        branches = [self.loops[head]] if head in self.loops else []
+        branches += [edge + self.walk(target, inner) for edge, target in self.edges[head]
+                     if target in component and self.walk(target, inner) != FAIL]
+        return '|'.join(branches)
+
+    def leave(self, component: frozenset[str], context: Context) -> str:
+        head = self.head(component)
+        inner = context + ((component, 'leave'),)
+        branches = [(edge, self.follow(target, inner)) for edge, target in self.edges[head]]
+        return alternatives(branches, self.can_stop(head, inner))
+
+    def pattern(self) -> str:
+        initial = self.initial
+        if initial not in self.live:
+            return FAIL
+        if initial not in self.accepting:
+            return f'(?>{self.walk(initial, ())})'
+
+        component = self.components(self.states)[initial]
+        if len(component) > 1:
+            inner = ((component, 'leave'),)
+            exits = [(edge, self.follow(target, inner)) for edge, target in self.edges[initial]]
+            repeated = [(f'(?:{self.cycle(component, ())})+', self.leave(component, ()))]
+        else:
+            exits = [(edge, self.walk(target, ())) for edge, target in self.edges[initial]]
+            repeated = [(f'{self.loops[initial]}++', alternatives(exits, True))] if initial in self.loops else []
+        pattern = alternatives(repeated + exits, False)
+        return pattern if pattern == FAIL else f'(?>{pattern})'
+
+
+def machine_to_pattern(machine: Machine) -> str:
+    return PatternWriter(machine).pattern()
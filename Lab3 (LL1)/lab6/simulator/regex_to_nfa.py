@@ -1,147 +1,294 @@
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+import sys
 
 
 class RegexNode:
-    def __init__(self, value: str, left: 'RegexNode' = None, right: 'RegexNode' = None):
+    interned: dict[tuple, 'RegexNode'] = {}
+
+    def __new__(cls, value: str, left: 'RegexNode' = None, right: 'RegexNode' = None,
+                ranges: tuple[tuple[str, str], ...] = ()):
+        key = (value, left, right, ranges)
+        node = cls.interned.get(key)
+        if node is None:
+            node = cls.interned[key] = super().__new__(cls)
+        return node
+
+    def __init__(self, value: str, left: 'RegexNode' = None, right: 'RegexNode' = None,
+                 ranges: tuple[tuple[str, str], ...] = ()):
         self.value = value
         self.left = left
         self.right = right
-
-
-class State:
-    def __init__(self):
-        self.transitions: dict[str, list['State']] = {}
-        self.epsilon_transitions: list['State'] = []
-
-    def add_transition(self, symbol: str, state: 'State') -> None:
-        if symbol not in self.transitions:
-            self.transitions[symbol] = []
-        self.transitions[symbol].append(state)
-
-    def add_epsilon_transition(self, state: 'State') -> None:
-        self.epsilon_transitions.append(state)
+        self.ranges = ranges
 
 
 class NFA:
-    def __init__(self, start_state: State, accept_state: State):
+    def __init__(self, start_state: int, accept_state: int, offsets: array, labels: list[str], targets: array):
         self.start_state = start_state
         self.accept_state = accept_state
+        self.offsets = offsets
+        self.labels = labels
+        self.targets = targets
+
+    @property
+    def state_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def edges(self, state: int) -> range:
+        return range(self.offsets[state], self.offsets[state + 1])
 
 
 def is_literal(value: str) -> bool:
-    return value not in '+*()|.^'
+    return value not in '+*()|.^[]'
+
+
+def range_label(low: str, high: str) -> str:
+    return low if low == high else f'{low}-{high}'
+
+
+def label_range(label: str) -> tuple[str, str] | None:
+    if len(label) == 1 and label != 'ε':
+        return label, label
+    if len(label) == 3 and label[1] == '-':
+        return label[0], label[2]
+    return None
+
+
+def split_ranges(labels: set[str]) -> dict[str, list[str]]:
+    bounds = sorted({ord(label_range(label)[0]) for label in labels} |
+                    {ord(label_range(label)[1]) + 1 for label in labels})
+    parts = {}
+    for label in labels:
+        low, high = label_range(label)
+        first = bisect_left(bounds, ord(low))
+        last = bisect_right(bounds, ord(high))
+        parts[label] = [range_label(chr(bounds[i]), chr(bounds[i + 1] - 1)) for i in range(first, last)]
+    return parts
+
+
+def normalize_ranges(ranges: list[tuple[str, str]], negated: bool) -> tuple[tuple[str, str], ...]:
+    merged: list[list[int]] = []
+    for low, high in sorted((ord(low), ord(high)) for low, high in ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    if negated:
+        complement = []
+        start = 0
+        for low, high in merged:
+            if start < low:
+                complement.append([start, low - 1])
+            start = high + 1
+        if start <= sys.maxunicode:
+            complement.append([start, sys.maxunicode])
+        merged = complement
+    return tuple((chr(low), chr(high)) for low, high in merged)
+
+
+def fold_balanced(value: str, nodes: list[RegexNode]) -> RegexNode:
+    while len(nodes) > 1:
+        folded = [RegexNode(value, left=nodes[i], right=nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+        if len(nodes) % 2:
+            folded.append(nodes[-1])
+        nodes = folded
+    return nodes[0]
+
+
+class ParseFrame:
+    def __init__(self, negations: int = 0):
+        self.negations = negations
+        self.alternatives: list[RegexNode] = []
+        self.sequence: list[RegexNode] = []
+
+    def close_term(self, token: str) -> None:
+        if not self.sequence:
+            raise ValueError(f'Unexpected token: {token}')
+        self.alternatives.append(fold_balanced('concat', self.sequence))
+        self.sequence = []
+
+    def close(self, token: str) -> RegexNode:
+        self.close_term(token)
+        return fold_balanced('or', self.alternatives)
+
+
+def parse_class(expression: str, position: int) -> tuple[RegexNode, int]:
+    def read_symbol() -> str:
+        nonlocal position
+        if expression[position] == '\\' and position + 1 < len(expression):
+            position += 1
+        position += 1
+        return expression[position - 1]
+
+    negated = expression.startswith('^', position)
+    if negated:
+        position += 1
+    ranges = []
+    while position < len(expression) and expression[position] != ']':
+        low = read_symbol()
+        high = low
+        if expression.startswith('-', position) and position + 1 < len(expression) and expression[position + 1] != ']':
+            position += 1
+            high = read_symbol()
+            if high < low:
+                raise ValueError(f'Invalid range: {low}-{high}')
+        ranges.append((low, high))
+    if position >= len(expression):
+        raise ValueError('Unterminated character class')
+    return RegexNode('class', ranges=normalize_ranges(ranges, negated)), position + 1
+
+
+PARSED: dict[str, RegexNode] = {}
 
 
 def parse_regex(expression: str) -> RegexNode:
-    def parse(tokens: list[str]):
-        def get_next() -> str | None:
-            return tokens.pop(0) if tokens else None
-
-        def parse_primary() -> RegexNode:
-            token = get_next()
-            if token == '\\':
-                escaped = get_next()
-                if is_literal(escaped):
-                    tokens.insert(0, escaped)
-                else:
-                    return RegexNode(escaped)
-            if is_literal(token):
-                return RegexNode(token)
-            elif token == '.':
-                return RegexNode('any')
-            elif token == '^':
-                negated_node = parse_primary()
-                return RegexNode('not', left=negated_node)
-            elif token == '(':
-                node = parse_expression()
-                if get_next() != ')':
-                    raise ValueError('Mismatched parentheses')
-                return node
+    tree = PARSED.get(expression)
+    if tree is None:
+        tree = PARSED[expression] = parse_expression(expression)
+    return tree
+
+
+def parse_expression(expression: str) -> RegexNode:
+    frames = [ParseFrame()]
+    negations = 0
+    position = 0
+
+    while position < len(expression):
+        token = expression[position]
+        position += 1
+        frame = frames[-1]
+        node = None
+
+        if token == '(':
+            frames.append(ParseFrame(negations))
+            negations = 0
+        elif token == ')':
+            if len(frames) == 1 or negations:
+                raise ValueError('Mismatched parentheses')
+            frames.pop()
+            node = frame.close(token)
+            for _ in range(frame.negations):
+                node = RegexNode('not', left=node)
+        elif token == '|':
+            if negations:
+                raise ValueError(f'Unexpected token: {token}')
+            frame.close_term(token)
+        elif token in ('*', '+'):
+            if negations or not frame.sequence:
+                raise ValueError(f'Unexpected token: {token}')
+            frame.sequence[-1] = RegexNode('multiply' if token == '*' else 'add', left=frame.sequence[-1])
+        elif token == '^':
+            negations += 1
+        elif token == '.':
+            node = RegexNode('any')
+        elif token == '[':
+            node, position = parse_class(expression, position)
+        elif token == '\\' and position < len(expression) and not is_literal(expression[position]):
+            node = RegexNode(expression[position])
+            position += 1
+        elif is_literal(token):
+            node = RegexNode(token)
+        else:
             raise ValueError(f'Unexpected token: {token}')
 
-        def parse_factor() -> RegexNode:
-            node = parse_primary()
-            while tokens and tokens[0] in ('*', '+'):
-                op = 'multiply' if get_next() == '*' else 'add'
-                node = RegexNode(op, left=node)
-            return node
-
-        def parse_term() -> RegexNode:
-            node = parse_factor()
-            while tokens and tokens[0] and (is_literal(tokens[0]) or tokens[0] in ('(', '.', '^')):
-                right = parse_factor()
-                node = RegexNode('concat', left=node, right=right)
-            return node
-
-        def parse_expression() -> RegexNode:
-            node = parse_term()
-            while tokens and tokens[0] == '|':
-                get_next()
-                right = parse_term()
-                node = RegexNode('or', left=node, right=right)
-            return node
-
-        return parse_expression()
-
-    return parse(list(expression))
-
-
-def build_nfa(node: RegexNode) -> NFA | None:
-    if node is None:
-        return None
-
-    if node.value not in ('concat', 'or', 'add', 'multiply', 'any', 'not'):
-        start = State()
-        accept = State()
-        start.add_transition(node.value, accept)
-        return NFA(start, accept)
-    elif node.value == 'any':
-        start = State()
-        accept = State()
-        start.add_transition('ANY', accept)
-        return NFA(start, accept)
-    elif node.value == 'not':
-        sub_nfa = build_nfa(node.left)
-        start = State()
-        accept = State()
-        start.add_epsilon_transition(sub_nfa.start_state)
-        sub_nfa.accept_state.add_transition('NOT', accept)
-        start.add_transition('ANY', accept)
-        return NFA(start, accept)
-    elif node.value == 'concat':
-        left_nfa = build_nfa(node.left)
-        right_nfa = build_nfa(node.right)
-        left_nfa.accept_state.add_epsilon_transition(right_nfa.start_state)
-        return NFA(left_nfa.start_state, right_nfa.accept_state)
-    elif node.value == 'or':
-        start = State()
-        accept = State()
-        left_nfa = build_nfa(node.left)
-        right_nfa = build_nfa(node.right)
-        start.add_epsilon_transition(left_nfa.start_state)
-        start.add_epsilon_transition(right_nfa.start_state)
-        left_nfa.accept_state.add_epsilon_transition(accept)
-        right_nfa.accept_state.add_epsilon_transition(accept)
-        return NFA(start, accept)
-    elif node.value == 'multiply':
-        start = State()
-        accept = State()
-        sub_nfa = build_nfa(node.left)
-        start.add_epsilon_transition(sub_nfa.start_state)
-        start.add_epsilon_transition(accept)
-        sub_nfa.accept_state.add_epsilon_transition(sub_nfa.start_state)
-        sub_nfa.accept_state.add_epsilon_transition(accept)
-        return NFA(start, accept)
-    elif node.value == 'add':
-        start = State()
-        accept = State()
-        sub_nfa = build_nfa(node.left)
-        start.add_epsilon_transition(sub_nfa.start_state)
-        sub_nfa.accept_state.add_epsilon_transition(sub_nfa.start_state)
-        sub_nfa.accept_state.add_epsilon_transition(accept)
-        return NFA(start, accept)
-
-    raise ValueError(f'Unexpected node value: {node.value}')
+        if node is not None:
+            for _ in range(negations):
+                node = RegexNode('not', left=node)
+            negations = 0
+            frames[-1].sequence.append(node)
+
+    if len(frames) != 1 or negations:
+        raise ValueError('Mismatched parentheses' if len(frames) != 1 else 'Unexpected end of pattern')
+    return frames[0].close('end of pattern')
+
+
+class NFABuilder:
+    def __init__(self):
+        self.state_count = 0
+        self.sources = array('i')
+        self.labels: list[str] = []
+        self.targets = array('i')
+
+    def add_state(self) -> int:
+        self.state_count += 1
+        return self.state_count - 1
+
+    def add_transition(self, source: int, symbol: str, target: int) -> None:
+        self.sources.append(source)
+        self.labels.append(symbol)
+        self.targets.append(target)
+
+    def build(self, start_state: int, accept_state: int) -> NFA:
+        offsets = array('i', [0] * (self.state_count + 1))
+        for source in self.sources:
+            offsets[source + 1] += 1
+        for state in range(self.state_count):
+            offsets[state + 1] += offsets[state]
+
+        positions = array('i', offsets[:-1])
+        labels: list[str] = [''] * len(self.labels)
+        targets = array('i', [0] * len(self.targets))
+        for source, symbol, target in zip(self.sources, self.labels, self.targets):
+            labels[positions[source]] = symbol
+            targets[positions[source]] = target
+            positions[source] += 1
+        return NFA(start_state, accept_state, offsets, labels, targets)
+
+
+def build_nfa(node: RegexNode) -> NFA:
+    builder = NFABuilder()
+    fragments: list[tuple[int, int]] = []
+    stack: list[tuple[RegexNode, bool]] = [(node, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if node.value in ('concat', 'or', 'add', 'multiply', 'not') and not expanded:
+            stack.append((node, True))
+            if node.right is not None:
+                stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+
+        if node.value == 'concat':
+            right_start, right_accept = fragments.pop()
+            left_start, left_accept = fragments.pop()
+            builder.add_transition(left_accept, 'ε', right_start)
+            fragments.append((left_start, right_accept))
+            continue
+
+        start = builder.add_state()
+        accept = builder.add_state()
+        if node.value == 'any':
+            builder.add_transition(start, 'ANY', accept)
+        elif node.value == 'class':
+            for low, high in node.ranges:
+                builder.add_transition(start, range_label(low, high), accept)
+        elif node.value == 'not':
+            sub_start, sub_accept = fragments.pop()
+            builder.add_transition(start, 'ε', sub_start)
+            builder.add_transition(sub_accept, 'NOT', accept)
+            builder.add_transition(start, 'ANY', accept)
+        elif node.value == 'or':
+            right_start, right_accept = fragments.pop()
+            left_start, left_accept = fragments.pop()
+            builder.add_transition(start, 'ε', left_start)
+            builder.add_transition(start, 'ε', right_start)
+            builder.add_transition(left_accept, 'ε', accept)
+            builder.add_transition(right_accept, 'ε', accept)
+        elif node.value in ('multiply', 'add'):
+            sub_start, sub_accept = fragments.pop()
+            builder.add_transition(start, 'ε', sub_start)
+            if node.value == 'multiply':
+                builder.add_transition(start, 'ε', accept)
+            builder.add_transition(sub_accept, 'ε', sub_start)
+            builder.add_transition(sub_accept, 'ε', accept)
+        else:
+            builder.add_transition(start, node.value, accept)
+        fragments.append((start, accept))
+
+    start, accept = fragments.pop()
+    return builder.build(start, accept)
 
 
 @dataclass
@@ -150,49 +297,6 @@ class MachineState:
     transitions: dict[str, set[str]]
 
 
-def adapt_nfa(nfa: NFA) -> tuple[str, str, dict[str, MachineState]]:
-    state_index: dict[State, str] = {}
-    index = 0
-
-    def assign_indices(state: State) -> None:
-        nonlocal index
-        if state not in state_index:
-            state_index[state] = f'S{index}'
-            index += 1
-            for symbol, states in state.transitions.items():
-                for s in states:
-                    assign_indices(s)
-            for s in state.epsilon_transitions:
-                assign_indices(s)
-
-    assign_indices(nfa.start_state)
-
-    initial_state = state_index[nfa.start_state]
-    finite_state = state_index[nfa.accept_state]
-
-    machine: dict[str, MachineState] = {state_index[s]: MachineState(name == finite_state, {}) for s, name in
-                                        state_index.items()}
-
-    for state_iter, name in state_index.items():
-        for symbol_iter, states_iter in state_iter.transitions.items():
-            machine[name].transitions.setdefault(symbol_iter, set()).update(state_index[s] for s in states_iter)
-        for s in state_iter.epsilon_transitions:
-            machine[name].transitions.setdefault('ε', set()).add(state_index[s])
-
-    symbols: set[str] = set()
-    for state_iter in machine:
-        trans = machine[state_iter].transitions
-        for symbol_iter in trans:
-            symbols.add(symbol_iter)
-
-    for state_iter in machine:
-        for symbol_iter in symbols:
-            machine[state_iter].transitions.setdefault(symbol_iter, set())
-
-    return initial_state, finite_state, machine
-
-
-def process_regex(regex_pattern: str) -> tuple[str, str, dict[str, MachineState]]:
+def process_regex(regex_pattern: str) -> NFA:
     tree = parse_regex(regex_pattern)
-    nfa = build_nfa(tree)
-    return adapt_nfa(nfa)
+    return build_nfa(tree)
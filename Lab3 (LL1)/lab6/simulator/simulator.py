@@ -1,32 +1,108 @@
-from .regex_to_nfa import process_regex
+from .regex_to_nfa import RegexNode, build_nfa, parse_regex, process_regex
 from .nfa_to_dfa import process_nfa
-from .minimize import process_dfa
+from .minimize import process_dfa, Machine
+from .combine import combine_machines
+from .compiled import CompiledMachine, compile_machine
+from .lazy import LazyDFA
+from .bitparallel import PositionAutomaton
+from .derivative import build_derivative_dfa
 
+MACHINES: dict[RegexNode, tuple[Machine, CompiledMachine]] = {}
+DERIVED: dict[RegexNode, tuple[Machine, CompiledMachine]] = {}
 
-def convert_regex_to_dfa(regex: str):
-    nfa = process_regex(regex)
-    dfa = process_nfa(*nfa)
-    machine = process_dfa(dfa)
-    return machine
+
+def convert_regex_to_dfa(regex: str) -> Machine:
+    return compile_regex(regex)[0]
+
+
+def compile_regex(regex: str) -> tuple[Machine, CompiledMachine]:
+    tree = parse_regex(regex)
+    if tree not in MACHINES:
+        machine = process_dfa(process_nfa(build_nfa(tree)))
+        MACHINES[tree] = machine, compile_machine(machine)
+    return MACHINES[tree]
+
+
+def derive_regex(regex: str) -> tuple[Machine, CompiledMachine]:
+    tree = parse_regex(regex)
+    if tree not in DERIVED:
+        machine = process_dfa(build_derivative_dfa(tree))
+        DERIVED[tree] = machine, compile_machine(machine)
+    return DERIVED[tree]
 
 
 class Simulator:
-    def __init__(self, regex: str):
-        self.machine = convert_regex_to_dfa(regex)
-
-    def run(self, text: str) -> str:
-        states, input_symbols, transitions, outputs, initial_state = self.machine
-
-        result = ''
-        current_state = initial_state
-        for symbol in text:
-            if symbol not in input_symbols and 'ANY' not in input_symbols:
-                return result if outputs[current_state] == 'F' else ''
-            transition = transitions[current_state].get(symbol, '')
-            if transition == '':
-                transition = transitions[current_state].get('ANY', '')
-            if transition == '':
-                return result if outputs[current_state] == 'F' else ''
-            result += symbol
-            current_state = transition
-        return result if outputs[current_state] == 'F' else ''
+    def __init__(self, regex: str, backend: str = 'dfa', cache_size: int = 256):
+        self.backend = backend
+        self.machine = None
+        self.compiled = None
+        self.lazy = None
+        self.positions = None
+        if backend == 'dfa':
+            self.machine, self.compiled = compile_regex(regex)
+        elif backend == 'derivative':
+            self.machine, self.compiled = derive_regex(regex)
+        elif backend == 'lazy':
+            self.lazy = LazyDFA(process_regex(regex), cache_size)
+        elif backend == 'bitparallel':
+            self.positions = PositionAutomaton(parse_regex(regex), cache_size)
+        else:
+            raise ValueError(f'Unknown simulator backend: {backend}')
+
+    def run(self, text: str, start: int = 0) -> int:
+        return self.match(text, start)[0]
+
+    def match(self, text: str, start: int = 0) -> tuple[int, int]:
+        if self.lazy is not None:
+            return self.lazy.match(text, start)
+        if self.positions is not None:
+            return self.positions.match(text, start)
+
+        classes = self.compiled.classes
+        table = self.compiled.table
+        accepting = self.compiled.accepting
+        universal = self.compiled.universal
+
+        current_state = self.compiled.start
+        last_accept = start if accepting[current_state] else -1
+        for position in range(start, len(text)):
+            if universal[current_state]:
+                return len(text), len(text)
+            current_state = table[current_state + classes[text[position]]]
+            if not current_state:
+                return last_accept, position + 1
+            if accepting[current_state]:
+                last_accept = position + 1
+        return last_accept, len(text)
+
+
+class CombinedSimulator:
+    def __init__(self, machines: list[Machine]):
+        self.machine = combine_machines(machines)
+
+    def run(self, text: str, start: int = 0) -> list[tuple[int, int]]:
+        return self.match(text, start)[0]
+
+    def match(self, text: str, start: int = 0) -> tuple[list[tuple[int, int]], int]:
+        classes = self.machine.classes
+        table = self.machine.table
+        finals = self.machine.finals
+        live = self.machine.live
+
+        accepts = {}
+        scanned = len(text)
+        current_state = self.machine.start
+        for position in range(start, len(text)):
+            if not live[current_state]:
+                scanned = position
+                break
+            current_state = table[current_state + classes[text[position]]]
+            if not current_state:
+                scanned = position + 1
+                break
+            for i in finals[current_state]:
+                accepts[i] = position + 1
+        if current_state and not live[current_state]:
+            accepts.update(dict.fromkeys(finals[current_state], len(text)))
+
+        return sorted(match for match in accepts.items() if match[1] > start), scanned
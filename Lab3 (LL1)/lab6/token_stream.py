@@ -0,0 +1,100 @@
+from array import array
+from collections.abc import Sequence
+
+from lab6.lexer_token import LexerToken, LineIndex
+from lab6.token_type import TOKEN_TYPES
+
+TYPE_NAMES = [token.name for token in TOKEN_TYPES]
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+
+
+class ShiftedArray(Sequence):
+    def __init__(self):
+        self.values = array('q')
+        self.shift_from = 0
+        self.shift = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int | slice) -> int | list[int]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        value = self.values[index]
+        return value + self.shift if index >= self.shift_from else value
+
+    def __setitem__(self, index: int, value: int) -> None:
+        if index < 0:
+            index += len(self)
+        self.values[index] = value - self.shift if index >= self.shift_from else value
+
+    def append(self, value: int) -> None:
+        self.values.append(value - self.shift)
+
+    def splice(self, start: int, stop: int, values: list[int], shift: int) -> None:
+        for i in range(self.shift_from, start):
+            self.values[i] += self.shift
+        for i in range(stop, self.shift_from):
+            self.values[i] -= self.shift
+        self.values[start:stop] = array('q', values)
+        self.shift_from = start + len(values)
+        self.shift += shift
+
+
+class TokenStream(Sequence):
+    def __init__(self, text: str, lines: LineIndex | None = None):
+        self.text = text
+        self.lines = lines if lines is not None else LineIndex(text)
+        self.types = array('H')
+        self.starts = ShiftedArray()
+        self.ends = ShiftedArray()
+        self.reach = ShiftedArray()
+
+    def append(self, token_type: str, start: int, end: int, reach: int = -1) -> None:
+        self.append_id(TYPE_IDS[token_type], start, end, reach)
+
+    def append_id(self, type_id: int, start: int, end: int, reach: int = -1) -> None:
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.reach.append(max(reach, self.reach[-1]) if self.reach else reach)
+
+    def append_token(self, token: LexerToken) -> None:
+        self.append(token.type, token.start, token.start + len(token.value), token.reach)
+
+    def replace(self, text: str, start: int, stop: int, tokens: list[tuple[int, int, int, int]], shift: int) -> None:
+        self.text = text
+        self.lines = LineIndex(text)
+        types, starts, ends, reach = (list(column) for column in zip(*tokens)) if tokens else ([], [], [], [])
+        floor = reach[-1] if reach else self.reach[start - 1] if start else -1
+        self.types[start:stop] = array('H', types)
+        self.starts.splice(start, stop, starts, shift)
+        self.ends.splice(start, stop, ends, shift)
+        self.reach.splice(start, stop, reach, shift)
+        for i in range(start + len(tokens), len(self)):
+            if self.reach[i] >= floor:
+                break
+            self.reach[i] = floor
+
+    def type(self, index: int) -> str:
+        return TYPE_NAMES[self.types[index]]
+
+    def value(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def pos(self, index: int) -> (int, int):
+        return self.lines.position(self.starts[index])
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int | slice) -> LexerToken | list[LexerToken]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('token index out of range')
+        return LexerToken(self.type(index), self.value(index), start=self.starts[index], lines=self.lines)
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from lab6.constants import *
 
 
@@ -13,42 +15,42 @@ class TokenType:
 TOKEN_TYPES = [
     TokenType('BLOCK_COMMENT', f'{{.*}}'),
     TokenType('LINE_COMMENT', f'//.*\n'),
-    TokenType('ARRAY', f'(A|a)(R|r)(R|r)(A|a)(Y|y)'),
-    TokenType('BEGIN', f'(B|b)(E|e)(G|g)(I|i)(N|n)'),
-    TokenType('ELSE', f'(E|e)(L|l)(S|s)(E|e)'),
-    TokenType('END', f'(E|e)(N|n)(D|d)'),
-    TokenType('IF', f'(I|i)(F|f)'),
-    TokenType('OF', f'(O|o)(F|f)'),
-    TokenType('OR', f'(O|o)(R|r)'),
-    TokenType('PROGRAM', f'(P|p)(R|r)(O|o)(G|g)(R|r)(A|a)(M|m)'),
-    TokenType('PROCEDURE', f'(P|p)(R|r)(O|o)(C|c)(E|e)(D|d)(U|u)(R|r)(E|e)'),
-    TokenType('THEN', f'(T|t)(H|h)(E|e)(N|n)'),
-    TokenType('TYPE', f'(T|t)(Y|y)(P|p)(E|e)'),
-    TokenType('INT', f'(I|i)(N|n)(T|t)'),
-    TokenType('REAL', f'(R|r)(E|e)(A|a)(L|l)'),
-    TokenType('CHAR', f'(C|c)(H|h)(A|a)(R|r)'),
-    TokenType('LOOP', f'(L|l)(O|o)(O|o)(P|p)'),
-    TokenType('WHILE', f'(W|w)(H|h)(I|i)(L|l)(E|e)'),
-    TokenType('PRINT', f'(P|p)(R|r)(I|i)(N|n)(T|t)'),
-    TokenType('READ', f'(R|r)(E|e)(A|a)(D|d)'),
-    TokenType('VAR', f'(V|v)(A|a)(R|r)'),
-    TokenType('AND', f'(A|a)(N|n)(D|d)'),
-    TokenType('DIV', f'(D|d)(I|i)(V|v)'),
-    TokenType('MOD', f'(M|m)(O|o)(D|d)'),
+    TokenType('ARRAY', f'[Aa][Rr][Rr][Aa][Yy]'),
+    TokenType('BEGIN', f'[Bb][Ee][Gg][Ii][Nn]'),
+    TokenType('ELSE', f'[Ee][Ll][Ss][Ee]'),
+    TokenType('END', f'[Ee][Nn][Dd]'),
+    TokenType('IF', f'[Ii][Ff]'),
+    TokenType('OF', f'[Oo][Ff]'),
+    TokenType('OR', f'[Oo][Rr]'),
+    TokenType('PROGRAM', f'[Pp][Rr][Oo][Gg][Rr][Aa][Mm]'),
+    TokenType('PROCEDURE', f'[Pp][Rr][Oo][Cc][Ee][Dd][Uu][Rr][Ee]'),
+    TokenType('THEN', f'[Tt][Hh][Ee][Nn]'),
+    TokenType('TYPE', f'[Tt][Yy][Pp][Ee]'),
+    TokenType('INT', f'[Ii][Nn][Tt]'),
+    TokenType('REAL', f'[Rr][Ee][Aa][Ll]'),
+    TokenType('CHAR', f'[Cc][Hh][Aa][Rr]'),
+    TokenType('LOOP', f'[Ll][Oo][Oo][Pp]'),
+    TokenType('WHILE', f'[Ww][Hh][Ii][Ll][Ee]'),
+    TokenType('PRINT', f'[Pp][Rr][Ii][Nn][Tt]'),
+    TokenType('READ', f'[Rr][Ee][Aa][Dd]'),
+    TokenType('VAR', f'[Vv][Aa][Rr]'),
+    TokenType('AND', f'[Aa][Nn][Dd]'),
+    TokenType('DIV', f'[Dd][Ii][Vv]'),
+    TokenType('MOD', f'[Mm][Oo][Dd]'),
     TokenType('MULTIPLICATION', '\\*'),
     TokenType('PLUS', '\\+'),
     TokenType('MINUS', '-'),
-    TokenType('NOT', f'(N|n)(O|o)(T|t)'),
-    TokenType('TRUE', f'(T|t)(R|r)(U|u)(E|e)'),
-    TokenType('FALSE', f'(F|f)(A|a)(L|l)(S|s)(E|e)'),
+    TokenType('NOT', f'[Nn][Oo][Tt]'),
+    TokenType('TRUE', f'[Tt][Rr][Uu][Ee]'),
+    TokenType('FALSE', f'[Ff][Aa][Ll][Ss][Ee]'),
     TokenType('IDENTIFIER', f'({LETTER}|_)({LETTER_OR_DIGIT}|_)*'),
     TokenType('DIVIDE', '/'),
     TokenType('SEMICOLON', ';'),
     TokenType('COMMA', ','),
     TokenType('LEFT_PAREN', '\\('),
     TokenType('RIGHT_PAREN', '\\)'),
-    TokenType('LEFT_BRACKET', '['),
-    TokenType('RIGHT_BRACKET', ']'),
+    TokenType('LEFT_BRACKET', '\\['),
+    TokenType('RIGHT_BRACKET', '\\]'),
     TokenType('EQ', '=='),
     TokenType('LESS_EQ', '<='),
     TokenType('GREATER_EQ', '>='),
@@ -67,3 +69,16 @@ TOKEN_TYPES = [
     TokenType('#', '#'),
     TokenType('BAD', '.*')
 ]
+
+KEYWORD_NAMES = (
+    'ARRAY', 'BEGIN', 'ELSE', 'END', 'IF', 'OF', 'OR', 'PROGRAM', 'PROCEDURE', 'THEN', 'TYPE', 'INT', 'REAL', 'CHAR',
+    'LOOP', 'WHILE', 'PRINT', 'READ', 'VAR', 'AND', 'DIV', 'MOD', 'NOT', 'TRUE', 'FALSE'
+)
+
+KEYWORDS = MappingProxyType({name.casefold(): name for name in KEYWORD_NAMES})
+
+TRIVIA_NAMES = ('SPACE', 'LINE_COMMENT', 'BLOCK_COMMENT')
+
+TRIVIA_REGEX = '(' + '|'.join(f'({token.regex})' for token in TOKEN_TYPES if token.name in TRIVIA_NAMES) + ')+'
+
+LEXER_TOKEN_TYPES = [token for token in TOKEN_TYPES if token.name not in KEYWORDS.values()]
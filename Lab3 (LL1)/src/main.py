@@ -68,7 +68,7 @@ def task4() -> None:
 
     input_file = sys.argv[1]
 
-    tokens = task(input_file)
+    tokens = task(input_file, output_path='output.txt')
 
     line = " ".join(token.type for token in tokens)
 
@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lab6.lexer import Lexer
+from lab6.simulator import Simulator, CombinedSimulator
+from lab6.simulator.derivative import build_derivative_dfa
+from lab6.simulator.minimize import process_dfa
+from lab6.simulator.nfa_to_dfa import process_nfa
+from lab6.simulator.regex_to_nfa import PARSED, RegexNode, build_nfa, parse_regex
+from lab6.simulator.simulator import DERIVED, MACHINES
+from lab6.token_type import TOKEN_TYPES, LEXER_TOKEN_TYPES, KEYWORD_NAMES
+
+DEFAULT_MIX = {
+    'keyword': 4,
+    'identifier': 6,
+    'integer': 2,
+    'float': 2,
+    'symbol': 6,
+    'string': 1,
+    'block_comment': 1,
+    'line_comment': 1,
+    'whitespace': 1,
+}
+
+SYMBOLS = [re.sub(r'\\(.)', r'\1', token.regex) for token in TOKEN_TYPES
+           if re.fullmatch(r'(\\.|[^\\\[\]().*+|^ε\s])+', token.regex) and token.name not in KEYWORD_NAMES]
+WORD_CHARS = string.ascii_letters + string.digits + '_'
+
+
+def random_case(rng: random.Random, word: str) -> str:
+    return ''.join(c.upper() if rng.random() < 0.5 else c.lower() for c in word)
+
+
+def random_word(rng: random.Random, low: int, high: int) -> str:
+    return ''.join(rng.choice(string.ascii_letters + ' ') for _ in range(rng.randint(low, high)))
+
+
+def make_token(rng: random.Random, kind: str) -> str:
+    if kind == 'keyword':
+        return random_case(rng, rng.choice(KEYWORD_NAMES))
+    if kind == 'identifier':
+        head = rng.choice(string.ascii_letters + '_')
+        return head + ''.join(rng.choice(WORD_CHARS) for _ in range(rng.randint(0, 12)))
+    if kind == 'integer':
+        return str(rng.randint(0, 10 ** rng.randint(1, 12)))
+    if kind == 'float':
+        mantissa = f'{rng.randint(0, 999)}.{rng.randint(0, 999)}'
+        return mantissa + rng.choice(['', f'E{rng.choice("+-")}{rng.randint(1, 99)}', f'E{rng.randint(1, 9)}'])
+    if kind == 'symbol':
+        return rng.choice(SYMBOLS)
+    if kind == 'string':
+        return f"'{random_word(rng, 0, 24)}'"
+    if kind == 'block_comment':
+        return f'{{{random_word(rng, 0, 60)}}}'
+    if kind == 'line_comment':
+        return f'//{random_word(rng, 0, 60)}\n'
+    if kind == 'whitespace':
+        return ''.join(rng.choice(' \t\n\r') for _ in range(rng.randint(16, 256)))
+    raise ValueError(f'Unknown token kind: {kind}')
+
+
+def generate_source(token_count: int, mix: dict[str, int] | None = None, seed: int = 0) -> str:
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = []
+    for index, kind in enumerate(rng.choices(kinds, weights, k=token_count)):
+        parts.append(make_token(rng, kind))
+        parts.append('\n' if index % 12 == 11 else ' ')
+    return ''.join(parts)
+
+
+def clear_build_caches() -> None:
+    MACHINES.clear()
+    DERIVED.clear()
+    PARSED.clear()
+    RegexNode.interned.clear()
+
+
+def measure_build() -> dict[str, float]:
+    results = {}
+    simulators = []
+    for token in LEXER_TOKEN_TYPES:
+        clear_build_caches()
+        started = time.perf_counter()
+        simulators.append(Simulator(token.regex))
+        results[token.name] = time.perf_counter() - started
+    started = time.perf_counter()
+    CombinedSimulator([simulator.machine for simulator in simulators])
+    results['<combined>'] = time.perf_counter() - started
+    return results
+
+
+def measure_backends() -> dict[str, dict[str, float]]:
+    results = {}
+    for token in TOKEN_TYPES:
+        clear_build_caches()
+        tree = parse_regex(token.regex)
+        started = time.perf_counter()
+        pipeline = process_dfa(process_nfa(build_nfa(tree)))
+        pipeline_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        derivative = process_dfa(build_derivative_dfa(tree))
+        results[token.name] = {
+            'dfa_seconds': pipeline_seconds,
+            'dfa_states': len(pipeline[0]),
+            'derivative_seconds': time.perf_counter() - started,
+            'derivative_states': len(derivative[0]),
+        }
+    return results
+
+
+def lex_file(path: str, skip_trivia: bool = False) -> int:
+    lexer = Lexer(path, skip_trivia)
+    count = 0
+    while lexer.next_token() is not None:
+        count += 1
+    lexer.close()
+    return count
+
+
+def measure_lexer(path: str, repeat: int, skip_trivia: bool = False) -> dict[str, float]:
+    timings = []
+    tokens = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        tokens = lex_file(path, skip_trivia)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    lex_file(path, skip_trivia)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'tokens': tokens,
+        'chars': os.path.getsize(path),
+        'best_seconds': best,
+        'mean_seconds': sum(timings) / len(timings),
+        'tokens_per_second': tokens / best if best else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        kind, _, weight = item.partition('=')
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f'Unknown token kind: {kind}')
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def run_benchmark(sizes: list[int], mix: dict[str, int], seed: int, repeat: int, skip_trivia: bool = False) -> dict:
+    report = {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'repeat': repeat,
+        'mix': mix,
+        'skip_trivia': skip_trivia,
+        'build_seconds': measure_build(),
+        'backends': measure_backends(),
+        'lexer': [],
+    }
+    for size in sizes:
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(generate_source(size, mix, seed))
+            report['lexer'].append({'size': size, **measure_lexer(path, repeat, skip_trivia)})
+        finally:
+            os.remove(path)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Lexer throughput benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--skip-trivia', action='store_true')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sizes, args.mix, args.seed, args.repeat, args.skip_trivia)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for result in report['lexer']:
+        print(f'{result["size"]:>8} tokens: {result["tokens_per_second"]:>12.0f} tokens/s, '
+              f'peak {result["peak_memory_bytes"] / 1024:.0f} KiB')
+    backends = report['backends'].values()
+    print(f'backends: dfa {sum(result["dfa_seconds"] for result in backends):.3f}s, '
+          f'derivative {sum(result["derivative_seconds"] for result in backends):.3f}s')
+    print(f'build: {sum(report["build_seconds"].values()):.3f}s, results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
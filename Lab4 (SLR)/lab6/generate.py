@@ -0,0 +1,187 @@
+import argparse
+import contextlib
+import hashlib
+import importlib
+import os
+import tempfile
+
+PACKAGE_DIR = os.path.dirname(__file__)
+SOURCES = ('token_type.py', 'constants.py', 'lexer.py', 'generate.py')
+MODULE_NAME = 'generated_lexer'
+DEFAULT_OUTPUT = os.path.join(PACKAGE_DIR, f'{MODULE_NAME}.py')
+
+RUNTIME = '''
+
+def char_class(classes: dict, starts: tuple, ranges: tuple, symbol: str) -> int:
+    class_id = classes.get(symbol)
+    if class_id is None:
+        code = ord(symbol)
+        index = bisect_right(starts, code) - 1
+        class_id = ranges[index][2] if index >= 0 and code <= ranges[index][1] else 0
+        classes[symbol] = class_id
+    return class_id
+
+
+def match_trivia(text: str, start: int) -> int:
+    current_state = TRIVIA_START
+    last_accept = start if TRIVIA_ACCEPTING[current_state] else -1
+    for position in range(start, len(text)):
+        current_state = TRIVIA_TABLE[current_state + char_class(TRIVIA_CLASSES, TRIVIA_STARTS, TRIVIA_RANGES,
+                                                                text[position])]
+        if not current_state:
+            break
+        if TRIVIA_ACCEPTING[current_state]:
+            last_accept = position + 1
+    return last_accept
+
+
+def match_tokens(text: str, start: int) -> list[tuple[int, int]]:
+    accepts = {}
+    current_state = START
+    for position in range(start, len(text)):
+        if not LIVE[current_state]:
+            accepts.update(dict.fromkeys(FINALS.get(current_state, ()), len(text)))
+            break
+        current_state = TABLE[current_state + char_class(CLASSES, STARTS, RANGES, text[position])]
+        if not current_state:
+            break
+        for i in FINALS.get(current_state, ()):
+            accepts[i] = position + 1
+    return sorted(match for match in accepts.items() if match[1] > start)
+
+
+def is_not_wrapped(text: str, start: int, end: int) -> bool:
+    prev = text[start - 1] if start else ''
+    return prev not in DIVIDERS or (len(text) > end and text[end] not in DIVIDERS)
+
+
+def next_token(text: str, position: int) -> tuple[str, int, int] | None:
+    for index, end in match_tokens(text, position):
+        token_name = TYPE_NAMES[index]
+        if token_name == 'LINE_COMMENT':
+            end -= 1
+        if token_name in WRAPPED and is_not_wrapped(text, position, end):
+            continue
+        if token_name == 'INTEGER' and end - position > 16:
+            token_name = 'BAD'
+        if token_name == 'IDENTIFIER':
+            token_name = 'BAD' if end - position > 256 else KEYWORDS.get(text[position:end].casefold(), token_name)
+        if 'BAD_' in token_name:
+            token_name = 'BAD'
+        return token_name, position, end
+    return None
+
+
+def tokenize(text: str, skip_trivia: bool = False) -> Iterator[tuple[str, int, str]]:
+    position = 0
+    while position < len(text):
+        if skip_trivia:
+            position = max(position, match_trivia(text, position))
+            if position >= len(text):
+                return
+        token = next_token(text, position)
+        if token is None:
+            return
+        token_name, start, position = token
+        yield token_name, start, text[start:position]
+'''
+
+
+def source_hash() -> str:
+    from lab6.simulator.cache import code_version
+
+    digest = hashlib.sha256(code_version().encode('ascii'))
+    for name in SOURCES:
+        with open(os.path.join(PACKAGE_DIR, name), 'rb') as f:
+            digest.update(name.encode('utf-8'))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def generated_hash(path: str) -> str | None:
+    try:
+        with open(path, encoding='utf-8') as f:
+            f.readline()
+            line = f.readline()
+    except OSError:
+        return None
+    return line.split("'")[1] if line.startswith('SOURCE_HASH = ') else None
+
+
+def classes_source(prefix: str, classes) -> list[str]:
+    return [f'{prefix}CLASSES = {dict(classes)!r}',
+            f'{prefix}STARTS = {tuple(classes.starts)!r}',
+            f'{prefix}RANGES = {tuple(classes.ranges)!r}']
+
+
+def render_module(digest: str) -> str:
+    from lab6.lexer import DIVIDERS, TOKEN_SIMULATOR, TRIVIA_SIMULATOR, WRAPPED
+    from lab6.token_type import KEYWORDS, LEXER_TOKEN_TYPES
+
+    combined = TOKEN_SIMULATOR.machine
+    trivia = TRIVIA_SIMULATOR.compiled
+    lines = [
+        '# Generated by python -m lab6.generate from TOKEN_TYPES. Do not edit.',
+        f'SOURCE_HASH = {digest!r}',
+        '',
+        'from bisect import bisect_right',
+        'from collections.abc import Iterator',
+        '',
+        f'TYPE_NAMES = {tuple(token.name for token in LEXER_TOKEN_TYPES)!r}',
+        f'KEYWORDS = {dict(KEYWORDS)!r}',
+        f'DIVIDERS = {DIVIDERS!r}',
+        f'WRAPPED = {WRAPPED!r}',
+        '',
+        *classes_source('', combined.classes),
+        f'TABLE = {tuple(combined.table)!r}',
+        f'FINALS = {({i: finals for i, finals in enumerate(combined.finals) if finals})!r}',
+        f'LIVE = {combined.live!r}',
+        f'START = {combined.start!r}',
+        '',
+        *classes_source('TRIVIA_', trivia.classes),
+        f'TRIVIA_TABLE = {tuple(trivia.table)!r}',
+        f'TRIVIA_ACCEPTING = {trivia.accepting!r}',
+        f'TRIVIA_START = {trivia.start!r}',
+    ]
+    return '\n'.join(lines) + RUNTIME
+
+
+def generate(path: str = DEFAULT_OUTPUT, force: bool = False) -> bool:
+    digest = source_hash()
+    if not force and generated_hash(path) == digest:
+        return False
+
+    source = render_module(digest)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(source)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+    return True
+
+
+def load_generated():
+    generate()
+    return importlib.import_module(f'lab6.{MODULE_NAME}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a standalone lexer module from TOKEN_TYPES')
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT)
+    parser.add_argument('--force', action='store_true')
+    args = parser.parse_args()
+
+    if generate(args.output, args.force):
+        print(f'Lexer module written to {args.output}')
+    else:
+        print(f'{args.output} is up to date')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,82 +1,154 @@
-from lab6.lexer_token import LexerToken
-from lab6.simulator import Simulator
-from lab6.token_type import TOKEN_TYPES
+import re
+from collections.abc import Iterator
 
-SIMULATORS_MAP = {token.name: Simulator(token.regex) for token in TOKEN_TYPES}
+from lab6.lexer_token import LexerToken, LineIndex
+from lab6.simulator import Simulator, CombinedSimulator, FirstCharIndex, load_cached, machine_to_pattern
+from lab6.simulator.minimize import Machine
+from lab6.token_type import LEXER_TOKEN_TYPES, KEYWORDS, TRIVIA_REGEX
+
+DIVIDERS = ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='
+WRAPPED = ('INTEGER', 'IDENTIFIER')
+
+
+def _build_simulators() -> tuple[dict[str, Simulator], CombinedSimulator, Simulator, FirstCharIndex]:
+    simulators = {token.name: Simulator(token.regex) for token in LEXER_TOKEN_TYPES}
+    machines = [simulators[token.name].machine for token in LEXER_TOKEN_TYPES]
+    return simulators, CombinedSimulator(machines), Simulator(TRIVIA_REGEX), FirstCharIndex(machines)
+
+
+SIMULATORS_MAP, TOKEN_SIMULATOR, TRIVIA_SIMULATOR, FIRST_CHAR_INDEX = load_cached(
+    'token_types',
+    [(token.name, token.regex) for token in LEXER_TOKEN_TYPES] + [('<trivia>', TRIVIA_REGEX)],
+    _build_simulators)
+
+PATTERNS: dict[str, list[re.Pattern | int]] = {}
+
+
+def _translate(machine: Machine) -> str | None:
+    try:
+        return machine_to_pattern(machine)
+    except ValueError:
+        return None
+
+
+def _build_patterns() -> None:
+    divider = '[^' + ''.join(re.escape(c) for c in DIVIDERS) + ']'
+    segments: list[re.Pattern | int] = []
+    groups = []
+    for i, token in enumerate(LEXER_TOKEN_TYPES):
+        pattern = _translate(SIMULATORS_MAP[token.name].machine)
+        if pattern is None:
+            if groups:
+                segments.append(re.compile('|'.join(groups)))
+                groups = []
+            segments.append(i)
+            continue
+        if token.name in WRAPPED:
+            pattern = f'(?<!{divider}){pattern}(?!{divider})'
+        groups.append(f'(?P<T{i}>{pattern})')
+    if groups:
+        segments.append(re.compile('|'.join(groups)))
+    trivia = _translate(TRIVIA_SIMULATOR.machine)
+    PATTERNS.update(token=segments, trivia=[] if trivia is None else [re.compile(trivia)])
 
 
 class Lexer:
-    def __init__(self, input_file: str):
-        self.file = open(input_file, 'r', encoding='utf-8')
-        self.buffer = ''
-        self.line = 1
-        self.column = 1
-        self.eof = False
-        self.prev = ''
+    def __init__(self, input_file: str | None = None, skip_trivia: bool = False, text: str | None = None,
+                 engine: str = 'dfa'):
+        if engine not in ('dfa', 're', 'types'):
+            raise ValueError(f'Unknown lexer engine: {engine}')
+        if engine == 're' and not PATTERNS:
+            _build_patterns()
+        if text is None:
+            with open(input_file, 'r', encoding='utf-8') as file:
+                text = file.read()
+        self.text = text
+        self.lines = LineIndex(self.text)
+        self.position = 0
+        self.skip_trivia = skip_trivia
+        self.skipped_trivia = False
+        self.engine = engine
 
     def _is_not_wrapped(self, result: str):
-        return (self.prev not in ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='
-                or (len(self.buffer) > len(result)
-                    and self.buffer[len(result)] not in ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='))
-
-    def _fill_buffer(self) -> None:
-        if not self.eof:
-            chunk = self.file.read(1024)
-            if chunk:
-                self.buffer += chunk
-                if not any(map(lambda space: space in self.buffer, ' \n\t\r')):
-                    self._fill_buffer()
-                if '//' in self.buffer and '\n' not in self.buffer:
-                    self._fill_buffer()
-                if '{' in self.buffer and '}' not in self.buffer:
-                    self._fill_buffer()
-            else:
-                self.eof = True
+        end = self.position + len(result)
+        prev = self.text[self.position - 1] if self.position else ''
+        return prev not in DIVIDERS or (len(self.text) > end and self.text[end] not in DIVIDERS)
 
-    def next_token(self) -> LexerToken | None:
-        while not self.eof or self.buffer:
-            self._fill_buffer()
-            if not self.buffer:
-                return None
-
-            for token_type in TOKEN_TYPES:
-                token_name = token_type.name
-                simulator = SIMULATORS_MAP.get(token_type.name)
-                result = simulator.run(self.buffer)
-                if result:
-                    if token_name == 'LINE_COMMENT':
-                        result = result[:-1]
-                    if token_name in (
-                            'ARRAY', 'BEGIN', 'ELSE', 'END', 'IF', 'OF', 'OR', 'PROGRAM', 'PROCEDURE', 'THEN',
-                            'TYPE', 'VAR', 'INTEGER', 'IDENTIFIER'):
-                        if self._is_not_wrapped(result):
-                            continue
-                    if token_name == 'INTEGER':
-                        if len(result) > 16:
-                            token_name = 'BAD'
-                    if token_name == 'IDENTIFIER':
-                        if len(result) > 256:
-                            token_name = 'BAD'
-                    if 'BAD_' in token_name:
-                        token_name = 'BAD'
-                    token = LexerToken(token_name, result, (self.line, self.column))
-                    self._update_position(result)
-                    return token
+    def _skip_trivia(self) -> int:
+        if self.engine == 're' and PATTERNS['trivia']:
+            match = PATTERNS['trivia'][0].match(self.text, self.position)
+            end, scanned = (match.end() if match else -1), len(self.text)
+        else:
+            end, scanned = TRIVIA_SIMULATOR.match(self.text, self.position)
+        self.skipped_trivia = end > self.position
+        if self.skipped_trivia:
+            self.position = end
+        return scanned
 
+    def next_token(self) -> LexerToken | None:
+        reach = self._skip_trivia() if self.skip_trivia else 0
+        if self.position >= len(self.text):
             return None
 
+        if self.engine == 're':
+            return self._match_patterns()
+
+        if self.engine == 'types':
+            matches = self._type_matches()
+        else:
+            combined, scanned = TOKEN_SIMULATOR.match(self.text, self.position)
+            reach = max(reach, scanned)
+            matches = ((index, end, scanned) for index, end in combined)
+        for index, end, scanned in matches:
+            reach = max(reach, scanned)
+            if end <= self.position:
+                continue
+            token_name = LEXER_TOKEN_TYPES[index].name
+            if token_name in WRAPPED:
+                reach = max(reach, end + 1)
+                if self._is_not_wrapped(self.text[self.position:end]):
+                    continue
+            return self._make_token(token_name, end, reach)
+
+        return None
+
+    def _match_patterns(self) -> LexerToken | None:
+        for segment in PATTERNS['token']:
+            if isinstance(segment, int):
+                token_name = LEXER_TOKEN_TYPES[segment].name
+                end, _ = SIMULATORS_MAP[token_name].match(self.text, self.position)
+                if end <= self.position or token_name in WRAPPED and self._is_not_wrapped(self.text[self.position:end]):
+                    continue
+                return self._make_token(token_name, end, len(self.text))
+            match = segment.match(self.text, self.position)
+            if match is not None:
+                return self._make_token(LEXER_TOKEN_TYPES[int(match.lastgroup[1:])].name, match.end(), len(self.text))
         return None
 
-    def _update_position(self, result: str) -> None:
-        self.prev = result[-1]
-        self.buffer = self.buffer[len(result):]
-        self.column += len(result)
-        if '\n' in result:
-            lines = result.split('\n')
-            self.line += len(lines) - 1
-            self.column = len(lines[-1]) + 1
+    def _type_matches(self) -> Iterator[tuple[int, int, int]]:
+        for index in FIRST_CHAR_INDEX.candidates(self.text[self.position]):
+            yield index, *SIMULATORS_MAP[LEXER_TOKEN_TYPES[index].name].match(self.text, self.position)
+
+    def _make_token(self, token_name: str, end: int, reach: int) -> LexerToken:
+        result = self.text[self.position:end]
+        if token_name == 'LINE_COMMENT':
+            result = result[:-1]
+        if token_name == 'INTEGER':
+            if len(result) > 16:
+                token_name = 'BAD'
+        if token_name == 'IDENTIFIER':
+            if len(result) > 256:
+                token_name = 'BAD'
+            else:
+                token_name = KEYWORDS.get(result.casefold(), token_name)
+        if 'BAD_' in token_name:
+            token_name = 'BAD'
+        reach = max(reach, self.position + len(result))
+        if reach >= len(self.text):
+            reach = len(self.text) + 1
+        token = LexerToken(token_name, result, start=self.position, lines=self.lines, reach=reach)
+        self.position += len(result)
+        return token
 
     def close(self) -> None:
-        if self.file is not None:
-            self.file.close()
-            self.file = None
+        self.text = ''
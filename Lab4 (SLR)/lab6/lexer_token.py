@@ -1,8 +1,49 @@
+from bisect import bisect_right
+
+
+class LineIndex:
+    __slots__ = ('text', 'starts')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts: list[int] | None = None
+
+    def _build(self) -> list[int]:
+        starts = [0]
+        position = self.text.find('\n')
+        while position != -1:
+            starts.append(position + 1)
+            position = self.text.find('\n', position + 1)
+        return starts
+
+    def position(self, offset: int) -> (int, int):
+        if self.starts is None:
+            self.starts = self._build()
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+
 class LexerToken:
-    def __init__(self, lexer_type: str, value: str, pos: (int, int)):
+    __slots__ = ('type', 'value', 'start', 'reach', 'lines', '_pos')
+
+    def __init__(self, lexer_type: str, value: str, pos: (int, int) = None, start: int = -1,
+                 lines: LineIndex | None = None, reach: int = -1):
         self.type = lexer_type
         self.value = value
-        self.pos = pos
+        self.start = start
+        self.reach = reach
+        self.lines = lines
+        self._pos = pos
+
+    @property
+    def pos(self) -> (int, int):
+        if self._pos is None:
+            self._pos = self.lines.position(self.start)
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: (int, int)) -> None:
+        self._pos = pos
 
     def __str__(self):
         return f'{self.type} {self.pos} "{self.value}"'
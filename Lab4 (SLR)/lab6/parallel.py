@@ -0,0 +1,99 @@
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from lab6.lexer import Lexer
+from lab6.token_stream import TokenStream, TYPE_IDS
+
+ChunkTokens = tuple[array, array, array, array]
+
+LOOKAHEAD = 1 << 16
+
+
+def split_offsets(text: str, count: int) -> list[int]:
+    offsets = [0]
+    for i in range(1, count):
+        newline = text.find('\n', max(len(text) * i // count, offsets[-1]))
+        if newline == -1:
+            break
+        if newline + 1 > offsets[-1]:
+            offsets.append(newline + 1)
+    if offsets[-1] < len(text):
+        offsets.append(len(text))
+    return offsets
+
+
+def lex_range(text: str, base: int, start: int, stop: int, length: int) -> ChunkTokens:
+    lexer = Lexer(text=text, skip_trivia=True)
+    lexer.position = start - base
+    complete = base + len(text) >= length
+    types, starts, ends, reach = array('H'), array('q'), array('q'), array('q')
+    while lexer.position < stop - base:
+        token = lexer.next_token()
+        if token is None or token.reach > len(text) and not complete:
+            break
+        types.append(TYPE_IDS[token.type])
+        starts.append(base + token.start)
+        ends.append(base + token.start + len(token.value))
+        reach.append(base + token.reach)
+    lexer.close()
+    return types, starts, ends, reach
+
+
+def stitch(lexer: Lexer, offsets: list[int], chunks: list[ChunkTokens]) -> list[tuple[int, int, int, int]]:
+    tokens = []
+    position = 0
+    for chunk_start, chunk_stop, (types, starts, ends, reach) in zip(offsets, offsets[1:], chunks):
+        if position >= chunk_stop:
+            continue
+        stands = {stand: i for i, stand in enumerate([chunk_start, *ends[:-1]])} if types else {}
+        while position < chunk_stop and position not in stands:
+            lexer.position = position
+            token = lexer.next_token()
+            if token is None:
+                return tokens
+            position = token.start + len(token.value)
+            tokens.append((TYPE_IDS[token.type], token.start, position, token.reach))
+        if position < chunk_stop:
+            first = stands[position]
+            tokens.extend(zip(types[first:], starts[first:], ends[first:], reach[first:]))
+            position = ends[-1]
+    return tokens
+
+
+def lex_parallel(input_file: str | None = None, workers: int | None = None, chunks: int | None = None,
+                 text: str | None = None, lookahead: int = LOOKAHEAD) -> TokenStream:
+    lexer = Lexer(input_file, skip_trivia=True, text=text)
+    offsets = split_offsets(lexer.text, chunks or workers or os.cpu_count() or 1)
+    bases = [max(start - 1, 0) for start in offsets[:-1]]
+    windows = [lexer.text[base:stop + lookahead] for base, stop in zip(bases, offsets[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lex_range, windows, bases, offsets, offsets[1:],
+                                    [len(lexer.text)] * len(windows)))
+
+    stream = TokenStream(lexer.text, lexer.lines)
+    bad = TYPE_IDS['BAD']
+    for type_id, start, end, reach in stitch(lexer, offsets, results):
+        if type_id == bad and stream.types and stream.types[-1] == bad and stream.ends[-1] == start:
+            stream.ends[-1] = end
+            stream.reach[-1] = max(stream.reach[-1], reach)
+            continue
+        stream.append_id(type_id, start, end, reach)
+    lexer.close()
+    return stream
+
+
+def main() -> None:
+    if len(sys.argv) not in {3, 4}:
+        print('Usage: python -m lab6.parallel <input-file> <output-file> [workers]')
+        return
+
+    stream = lex_parallel(sys.argv[1], int(sys.argv[3]) if len(sys.argv) == 4 else None)
+    with open(sys.argv[2], 'w', encoding='utf-8') as output:
+        for token in stream:
+            output.write(str(token) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+from .simulator import Simulator, CombinedSimulator
+from .cache import load_cached
+from .pattern import machine_to_pattern
+from .dispatch import FirstCharIndex
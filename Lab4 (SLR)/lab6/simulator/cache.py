@@ -0,0 +1,63 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '__pycache__')
+
+
+def code_version() -> str:
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(__file__)
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_key(patterns: list[tuple[str, str]], build: Callable) -> str:
+    digest = hashlib.sha256(code_version().encode('ascii'))
+    with open(build.__code__.co_filename, 'rb') as f:
+        digest.update(f.read())
+    for name, regex in patterns:
+        digest.update(f'{len(name)}:{name}{len(regex)}:{regex}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_cached(name: str, patterns: list[tuple[str, str]], build: Callable[[], T]) -> T:
+    path = os.path.join(CACHE_DIR, f'{name}.pickle')
+    key = cache_key(patterns, build)
+
+    try:
+        with open(path, 'rb') as f:
+            cached_key, value = pickle.load(f)
+        if cached_key == key:
+            return value
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+        pass
+
+    value = build()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    except OSError:
+        return value
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PicklingError):
+        pass
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+    return value
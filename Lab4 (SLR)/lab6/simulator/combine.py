@@ -0,0 +1,64 @@
+from array import array
+
+from .compiled import ANY, CharClasses, build_classes, coaccessible_states, shared_symbols, step
+from .minimize import Machine
+
+
+class CombinedMachine:
+    def __init__(self, classes: CharClasses, class_count: int, table: array, finals: list[tuple[int, ...]],
+                 live: bytes, start: int):
+        self.classes = classes
+        self.class_count = class_count
+        self.table = table
+        self.finals = finals
+        self.live = live
+        self.start = start
+
+
+def is_universal(machine: Machine, state: str) -> bool:
+    _, input_symbols, transitions, outputs, _ = machine
+    if outputs[state] != 'F' or transitions[state].get(ANY) != state:
+        return False
+    return all(transitions[state][symbol] in ('', state) for symbol in input_symbols)
+
+
+def combine_machines(machines: list[Machine]) -> CombinedMachine:
+    symbols, owners = shared_symbols(machines)
+    symbols.append(ANY)
+
+    universal_states = [{state for state in machine[0] if is_universal(machine, state)} for machine in machines]
+    coaccessible = [coaccessible_states(machine) for machine in machines]
+
+    initial = tuple((i, machine[4]) for i, machine in enumerate(machines) if machine[4] in coaccessible[i])
+    state_index = {initial: 1}
+    states = [initial]
+    transitions: dict[str, list[int]] = {symbol: [] for symbol in symbols}
+
+    for state in states:
+        for symbol in symbols:
+            target = []
+            for i, s in state:
+                next_state = step(machines[i], s, owners[i].get(symbol, ANY))
+                if next_state in coaccessible[i]:
+                    target.append((i, next_state))
+            target = tuple(target)
+            if target and target not in state_index:
+                state_index[target] = len(states) + 1
+                states.append(target)
+            transitions[symbol].append(state_index[target] if target else 0)
+
+    classes, representatives = build_classes(symbols[:-1], lambda s: tuple(transitions[s]))
+    class_count = len(representatives)
+    size = class_count * (len(states) + 1)
+
+    table = array('i', [0] * size)
+    finals: list[tuple[int, ...]] = [()] * size
+    live = bytearray(size)
+    for row, state in enumerate(states, 1):
+        offset = row * class_count
+        for column, symbol in enumerate(representatives):
+            table[offset + column] = transitions[symbol][row - 1] * class_count
+        finals[offset] = tuple(i for i, s in state if machines[i][3][s] == 'F')
+        live[offset] = any(s not in universal_states[i] for i, s in state)
+
+    return CombinedMachine(classes, class_count, table, finals, bytes(live), class_count)
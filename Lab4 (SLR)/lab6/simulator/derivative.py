@@ -0,0 +1,239 @@
+from bisect import bisect_right
+from typing import Any, Callable, Hashable, Iterable
+
+from .minimize import Machine
+from .regex_to_nfa import RegexNode, range_label
+
+Term = tuple
+
+EMPTY: Term = ('empty',)
+EPSILON: Term = ('eps',)
+NOT: Term = ('not',)
+ANY: Term = ('any',)
+MISSING = object()
+
+
+def char_set(ranges: tuple[tuple[int, int], ...]) -> Term:
+    return ('set', ranges) if ranges else EMPTY
+
+
+def concat(*terms: Term) -> Term:
+    items = ()
+    for term in terms:
+        if term is EMPTY:
+            return EMPTY
+        if term is not EPSILON:
+            items += term[1] if term[0] == 'cat' else (term,)
+    if NOT in items:
+        items = items[:items.index(NOT) + 1]
+    if not items:
+        return EPSILON
+    return items[0] if len(items) == 1 else ('cat', items)
+
+
+def alternate(*terms: Term) -> Term:
+    members = set()
+    for term in terms:
+        if term[0] == 'alt':
+            members.update(term[1])
+        elif term is not EMPTY:
+            members.add(term)
+    if len(members) > 1:
+        members.discard(NOT)
+    if not members:
+        return EMPTY
+    if len(members) == 1:
+        return next(iter(members))
+    return 'alt', frozenset(members)
+
+
+def star(term: Term) -> Term:
+    if term is EMPTY or term is EPSILON:
+        return EPSILON
+    if term[0] == 'star':
+        return term
+    return 'star', term
+
+
+def known_nullable(term: Term) -> bool | None:
+    if term[0] in ('cat', 'alt'):
+        return None
+    return term[0] in ('eps', 'star')
+
+
+def post_order(root: Hashable, cache: dict, children: Callable[[Any], Iterable], combine: Callable[[Any], Any]):
+    result = cache.get(root, MISSING)
+    if result is not MISSING:
+        return result
+    stack = [(root, True)]
+    stack.extend((child, False) for child in children(root))
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            result = cache[node] = combine(node)
+        elif node not in cache:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children(node))
+    return result
+
+
+def node_children(node: RegexNode) -> tuple[RegexNode, ...]:
+    if node.value in ('concat', 'or'):
+        return node.left, node.right
+    if node.value in ('multiply', 'add', 'not'):
+        return node.left,
+    return ()
+
+
+def to_term(node: RegexNode, terms: dict[RegexNode, Term]) -> Term:
+    def combine(node: RegexNode) -> Term:
+        if node.value == 'concat':
+            return concat(terms[node.left], terms[node.right])
+        if node.value == 'or':
+            return alternate(terms[node.left], terms[node.right])
+        if node.value == 'multiply':
+            return star(terms[node.left])
+        if node.value == 'add':
+            return concat(terms[node.left], star(terms[node.left]))
+        if node.value == 'not':
+            return alternate(ANY, concat(terms[node.left], NOT))
+        if node.value == 'any':
+            return ANY
+        if node.value == 'class':
+            return char_set(tuple((ord(low), ord(high)) for low, high in node.ranges))
+        if node.value == 'ε':
+            return EPSILON
+        return char_set(((ord(node.value), ord(node.value)),))
+
+    return post_order(node, terms, node_children, combine)
+
+
+class Deriver:
+    def __init__(self):
+        self.nullable_cache: dict[Term, bool] = {}
+        self.literal_cache: dict[Term, frozenset[tuple[int, int]]] = {}
+        self.derivatives: dict[tuple[int | None, bool], dict[Term, Term]] = {}
+
+    def nullable(self, term: Term) -> bool:
+        cache = self.nullable_cache
+
+        def children(term: Term) -> list[Term]:
+            pending = []
+            for child in term[1] if term[0] in ('cat', 'alt') else ():
+                known = known_nullable(child)
+                if known is None:
+                    pending.append(child)
+                elif known != (term[0] == 'cat'):
+                    break
+            return pending
+
+        def combine(term: Term) -> bool:
+            if term[0] not in ('cat', 'alt'):
+                return known_nullable(term)
+            decisive = term[0] == 'alt'
+            for child in term[1]:
+                known = known_nullable(child)
+                if (cache[child] if known is None else known) == decisive:
+                    return decisive
+            return not decisive
+
+        return post_order(term, cache, children, combine)
+
+    def prefix(self, items: tuple[Term, ...]) -> tuple[Term, ...]:
+        for i, item in enumerate(items):
+            if not self.nullable(item):
+                return items[:i + 1]
+        return items
+
+    def children(self, term: Term) -> tuple[Term, ...]:
+        kind = term[0]
+        if kind == 'cat':
+            return self.prefix(term[1])
+        if kind == 'alt':
+            return tuple(term[1])
+        if kind == 'star':
+            return term[1],
+        return ()
+
+    def literals(self, term: Term) -> frozenset[tuple[int, int]]:
+        cache = self.literal_cache
+
+        def combine(term: Term) -> frozenset[tuple[int, int]]:
+            if term[0] == 'set':
+                return frozenset(term[1])
+            return frozenset().union(*(cache[child] for child in self.children(term)))
+
+        return post_order(term, cache, self.children, combine)
+
+    def derive(self, term: Term, code: int | None, literal: bool) -> Term:
+        cache = self.derivatives.setdefault((code, literal), {})
+
+        def combine(term: Term) -> Term:
+            kind = term[0]
+            if kind == 'set':
+                return EPSILON if code is not None and any(low <= code <= high for low, high in term[1]) else EMPTY
+            if kind == 'any':
+                return EMPTY if literal else EPSILON
+            if kind == 'cat':
+                items = term[1]
+                return alternate(*(concat(cache[item], ('cat', items[i + 1:]))
+                                   for i, item in enumerate(self.prefix(items))))
+            if kind == 'alt':
+                return alternate(*(cache[member] for member in term[1]))
+            if kind == 'star':
+                return concat(cache[term[1]], term)
+            return EMPTY
+
+        return post_order(term, cache, self.children, combine)
+
+    def moves(self, term: Term) -> tuple[list[tuple[int, int, Term]], Term]:
+        literals = self.literals(term)
+        bounds = sorted({low for low, _ in literals} | {high + 1 for _, high in literals})
+        moves = []
+        for low, high in zip(bounds, bounds[1:]):
+            if any(first <= low <= last for first, last in literals):
+                moves.append((low, high - 1, self.derive(term, low, True)))
+        return moves, self.derive(term, None, False)
+
+
+def build_derivative_dfa(node: RegexNode) -> Machine:
+    deriver = Deriver()
+    initial = to_term(node, {})
+    names = {initial: 's0'}
+    terms = [initial]
+    moves: dict[str, tuple[list[tuple[int, int, str]], str]] = {}
+
+    for term in terms:
+        literal_moves, any_move = deriver.moves(term)
+        targets = []
+        for target in [move[2] for move in literal_moves] + [any_move]:
+            if target is EMPTY:
+                targets.append('')
+                continue
+            if target not in names:
+                names[target] = f's{len(terms)}'
+                terms.append(target)
+            targets.append(names[target])
+        moves[names[term]] = ([(low, high, target) for (low, high, _), target in zip(literal_moves, targets)],
+                              targets[-1])
+
+    bounds = sorted({low for literal_moves, _ in moves.values() for low, _, _ in literal_moves} |
+                    {high + 1 for literal_moves, _ in moves.values() for _, high, _ in literal_moves})
+    parts = [(low, high - 1) for low, high in zip(bounds, bounds[1:])]
+    labels = [range_label(chr(low), chr(high)) for low, high in parts]
+
+    states = [names[term] for term in terms]
+    transitions: dict[str, dict[str, str]] = {}
+    outputs = {}
+    for term, state in zip(terms, states):
+        literal_moves, any_move = moves[state]
+        starts = [low for low, _, _ in literal_moves]
+        transitions[state] = {}
+        for (low, high), label in zip(parts, labels):
+            index = bisect_right(starts, low) - 1
+            found = index >= 0 and high <= literal_moves[index][1]
+            transitions[state][label] = literal_moves[index][2] if found else ''
+        transitions[state]['ANY'] = any_move
+        outputs[state] = 'F' if deriver.nullable(term) else ''
+
+    return states, labels + ['ANY'], transitions, outputs, 's0'
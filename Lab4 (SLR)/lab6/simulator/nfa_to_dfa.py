@@ -1,94 +1,80 @@
-from .regex_to_nfa import MachineState
-
-
-def fill_epsilon(machine: dict[str, MachineState]) -> dict[str, list[str]]:
-    epsilon: dict[str, list[str]] = {}
-
-    for state in machine:
-        visited = set()
-        stack = [state]
-
-        while stack:
-            vertex = stack.pop()
-
-            if vertex not in visited:
-                visited.add(vertex)
-
-                if 'ε' not in machine[vertex].transitions:
-                    continue
-                for neighbor in machine[vertex].transitions['ε']:
-                    if neighbor:
-                        stack.append(neighbor)
-
-        epsilon[state] = list(visited)
-
-    return epsilon
-
-
-def get_dependencies(states: list[str], epsilon: dict[str, list[str]]) -> list[str]:
-    dependencies: set[str] = set()
-
-    for state in states:
-        dependencies.add(state)
-        for transition in epsilon[state]:
-            dependencies.add(transition)
-
-    return list(dependencies)
-
-
-def find_key_with_value(dictionary: dict[str, list[str]], new_value: list[str]) -> str | None:
-    for key, value in dictionary.items():
-        if tuple(sorted(value)) == tuple(sorted(new_value)):
-            return key
-
-    return None
-
-
-def create_dfa(initial_state: str, finite_state: str, epsilon: dict[str, list[str]],
-               machine: dict[str, MachineState]) -> dict[str, MachineState]:
-    s_count = 0
-    state_dependencies = {'s0': [initial_state]}
-    states = ['s0']
+from .regex_to_nfa import NFA, MachineState, label_range, split_ranges
+
+
+def split_labels(nfa: NFA) -> dict[str, list[str]]:
+    labels = set(nfa.labels)
+    parts = split_ranges({label for label in labels if label_range(label)})
+    for label in labels:
+        parts.setdefault(label, [label])
+    return parts
+
+
+def epsilon_closure(state: int, nfa: NFA, closures: dict[int, frozenset[int]]) -> frozenset[int]:
+    closure = closures.get(state)
+    if closure is not None:
+        return closure
+
+    labels = nfa.labels
+    targets = nfa.targets
+    visited = {state}
+    stack = [state]
+    while stack:
+        vertex = stack.pop()
+        for edge in nfa.edges(vertex):
+            if labels[edge] == 'ε' and targets[edge] not in visited:
+                visited.add(targets[edge])
+                stack.append(targets[edge])
+
+    closure = closures[state] = frozenset(visited)
+    return closure
+
+
+def create_dfa(nfa: NFA, parts: dict[str, list[str]]) -> dict[str, MachineState]:
+    closures: dict[int, frozenset[int]] = {}
+    initial = epsilon_closure(nfa.start_state, nfa, closures)
+    state_index = {initial: 's0'}
+    subsets = [initial]
     new_machine: dict[str, MachineState] = {}
 
-    for state in states:
-        new_machine[state] = MachineState(finite_state in get_dependencies(state_dependencies[state], epsilon), {})
-
-        for symbol in filter(lambda x: x != 'ε', machine[initial_state].transitions):
-            transitions = []
-            for dependency in get_dependencies(state_dependencies[state], epsilon):
-                transitions.extend(machine[dependency].transitions[symbol])
-            transitions = list(set(transitions))
-            key = ''
-            if len(transitions) != 0:
-                key = find_key_with_value(state_dependencies, transitions)
+    for subset in subsets:
+        moves: dict[str, set[int]] = {}
+        for nfa_state in subset:
+            for edge in nfa.edges(nfa_state):
+                label = nfa.labels[edge]
+                if label != 'ε':
+                    for symbol in parts[label]:
+                        moves.setdefault(symbol, set()).add(nfa.targets[edge])
+
+        transitions: dict[str, set[str]] = {}
+        for symbol, targets in moves.items():
+            target = frozenset().union(*(epsilon_closure(t, nfa, closures) for t in targets))
+            key = state_index.get(target)
             if key is None:
-                s_count += 1
-                key = f's{s_count}'
-                states.append(key)
-                state_dependencies[key] = transitions
-            new_machine[state].transitions[symbol] = {key}
+                key = state_index[target] = f's{len(subsets)}'
+                subsets.append(target)
+            transitions[symbol] = {key}
+        new_machine[state_index[subset]] = MachineState(nfa.accept_state in subset, transitions)
 
     return new_machine
 
 
-def adapt_dfa(initial_state: str, machine: dict[str, MachineState]) -> tuple[
+def adapt_dfa(initial_state: str, input_symbols: list[str], machine: dict[str, MachineState]) -> tuple[
     list[str], list[str], dict[str, dict[str, str]], dict[str, str], str]:
     states = list(machine.keys())
-    input_symbols = list(machine[initial_state].transitions.keys())
     outputs = {}
     transitions: dict[str, dict[str, str]] = {}
     for state in states:
         outputs[state] = 'F' if machine[state].is_finite else ''
         transitions[state] = {}
         for symbol in input_symbols:
-            transitions[state][symbol] = machine[state].transitions[symbol].pop()
+            target = machine[state].transitions.get(symbol)
+            transitions[state][symbol] = next(iter(target)) if target else ''
 
     return states, input_symbols, transitions, outputs, initial_state
 
 
-def process_nfa(initial_state: str, finite_state: str, machine: dict[str, MachineState]) -> tuple[
-    list[str], list[str], dict[str, dict[str, str]], dict[str, str], str]:
-    epsilon = fill_epsilon(machine)
-    dfa = create_dfa(initial_state, finite_state, epsilon, machine)
-    return adapt_dfa('s0', dfa)
+def process_nfa(nfa: NFA) -> tuple[list[str], list[str], dict[str, dict[str, str]], dict[str, str], str]:
+    parts = split_labels(nfa)
+    input_symbols = list(dict.fromkeys(symbol for label in nfa.labels if label != 'ε' for symbol in parts[label]))
+    dfa = create_dfa(nfa, parts)
+    return adapt_dfa('s0', input_symbols, dfa)
@@ -1,4 +1,4 @@
-from lab6.lexer import Lexer
+from lab6.main import iter_tokens
 from lab6.lexer_token import LexerToken
 
 
@@ -38,15 +38,10 @@ class Runner:
         symbol_stack: list[str] = []
         position = 0
 
-        lexer = Lexer(self._file_path)
+        tokens = iter_tokens(self._file_path)
 
         def next_significant_token():
-            while True:
-                token = lexer.next_token()
-                if token is None:
-                    return None
-                if token.type not in ('SPACE', 'BLOCK_COMMENT', 'LINE_COMMENT'):
-                    return token
+            return next(tokens, None)
 
         token = next_significant_token()
 